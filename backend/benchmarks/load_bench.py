@@ -0,0 +1,642 @@
+"""
+Load test: every /api route plus WebSocket fan-out, against seeded data.
+
+Seeds N workspaces with M members and K tasks each (skewed status, priority,
+assignee and project distributions, reproducible from --seed), starts the app
+in-process under uvicorn and drives each route with concurrent clients. For
+every route it reports p50/p95/p99 latency, throughput and MongoDB commands per
+request, then measures broadcast delivery latency to connected WebSockets.
+
+Results are written as JSON and can be compared against a stored baseline:
+
+    cd backend
+    pip install httpx                      # plus mongomock-motor for --fake
+    python benchmarks/load_bench.py --mongo-url mongodb://localhost:27017 --out results.json
+    python benchmarks/load_bench.py --fake --workspaces 2 --tasks 500
+    python benchmarks/load_bench.py --mongo-url ... --baseline results.json --max-regression 0.25
+
+Against a real mongod the database named by --db-name is dropped first, so it
+must contain "bench". The in-process fake (mongomock) has no $unionWith,
+$substrCP or $indexOfArray and does not emit command events: routes that need
+those operators report errors and command counts are null. Use it to smoke-test
+the harness, and a real mongod for numbers.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import random
+import socket
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from pymongo import monitoring
+
+STATUS_WEIGHTS = {"done": 0.55, "todo": 0.2, "in_progress": 0.15, "review": 0.1}
+PRIORITY_WEIGHTS = {"low": 0.3, "medium": 0.4, "high": 0.2, "urgent": 0.1}
+UNASSIGNED_SHARE = 0.15
+BENCH_PASSWORD = "bench-password"
+
+# Driver chatter that is not issued by a request handler
+IGNORED_COMMANDS = {"ping", "hello", "ismaster", "isMaster", "endSessions", "killCursors"}
+
+
+class CommandCounter(monitoring.CommandListener):
+    def __init__(self):
+        self.count = 0
+
+    def started(self, event):
+        if event.command_name not in IGNORED_COMMANDS:
+            self.count += 1
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--mongo-url", help="run against this mongod")
+    target.add_argument("--fake", action="store_true", help="run against in-process mongomock")
+    parser.add_argument("--db-name", default="devpulse_bench")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--workspaces", type=int, default=5)
+    parser.add_argument("--members", type=int, default=20)
+    parser.add_argument("--tasks", type=int, default=2000, help="tasks per workspace")
+    parser.add_argument("--projects", type=int, default=5, help="projects per workspace")
+    parser.add_argument("--requests", type=int, default=200, help="requests per route")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--ws-clients", type=int, default=50)
+    parser.add_argument("--ws-events", type=int, default=100)
+    parser.add_argument("--out", default="load_results.json")
+    parser.add_argument("--baseline", help="previous results to compare against")
+    parser.add_argument("--max-regression", type=float, default=0.25,
+                        help="allowed relative p95 increase before exiting 1 (with --baseline)")
+    return parser.parse_args()
+
+
+def object_id(rng: random.Random) -> str:
+    return f"{rng.getrandbits(96):024x}"
+
+
+def skewed_choice(rng: random.Random, items: list):
+    """Zipf-like pick: the first items are chosen far more often than the tail"""
+    weights = [1 / (rank + 1) for rank in range(len(items))]
+    return rng.choices(items, weights)[0]
+
+
+def generate(args, server, password_hash: str) -> tuple:
+    """Build every seeded document in memory; identical for identical arguments"""
+    rng = random.Random(args.seed)
+    now = datetime.now(timezone.utc)
+    data = {"users": [], "workspaces": [], "projects": [], "teams": [], "tasks": [], "invites": []}
+    fixtures = {"workspaces": [], "scratch_users": []}
+
+    def user_doc(email: str, name: str, workspaces: list) -> dict:
+        return {
+            "id": object_id(rng),
+            "name": name,
+            "email": email,
+            "password": password_hash,
+            "avatar": f"https://api.dicebear.com/7.x/avataaars/svg?seed={name}",
+            "workspaces": workspaces,
+            "must_change_password": False,
+            "created_at": now.isoformat()
+        }
+
+    for w in range(args.workspaces):
+        workspace_id = object_id(rng)
+        members = [user_doc(f"bench-w{w}-m{m}@example.com", f"Member {w}-{m}", [workspace_id]) for m in range(args.members)]
+        data["users"].extend(members)
+        data["workspaces"].append({
+            "id": workspace_id,
+            "name": f"Bench Workspace {w}",
+            "owner_id": members[0]["id"],
+            "members": [{"user_id": u["id"], "role": "admin" if i == 0 else "member"} for i, u in enumerate(members)],
+            "created_at": now.isoformat()
+        })
+        project_ids = [object_id(rng) for _ in range(args.projects)]
+        data["projects"].extend({
+            "id": pid,
+            "name": f"Project {w}-{p}",
+            "description": None,
+            "workspace_id": workspace_id,
+            "team_id": None,
+            "created_at": now.isoformat()
+        } for p, pid in enumerate(project_ids))
+        team_id = object_id(rng)
+        data["teams"].append({
+            "id": team_id,
+            "name": f"Team {w}",
+            "description": None,
+            "workspace_id": workspace_id,
+            "member_ids": [u["id"] for u in members[: max(1, len(members) // 2)]],
+            "created_at": now.isoformat()
+        })
+        invite_token = f"bench-invite-{w}-{rng.getrandbits(64):x}"
+        data["invites"].append({
+            "id": object_id(rng),
+            "workspace_id": workspace_id,
+            "token": invite_token,
+            "email": None,
+            "created_at": now.isoformat(),
+            "expires_at": now + timedelta(days=7),
+            "created_by": members[0]["id"]
+        })
+
+        task_ids = []
+        for t in range(args.tasks):
+            status = rng.choices(list(STATUS_WEIGHTS), list(STATUS_WEIGHTS.values()))[0]
+            priority = rng.choices(list(PRIORITY_WEIGHTS), list(PRIORITY_WEIGHTS.values()))[0]
+            assignee = None if rng.random() < UNASSIGNED_SHARE else skewed_choice(rng, members)["id"]
+            updated = now - timedelta(days=min(rng.expovariate(1 / 45), 365), seconds=rng.randint(0, 86399))
+            created = updated - timedelta(days=rng.randint(0, 30))
+            due = created + timedelta(days=rng.randint(1, 30)) if rng.random() < 0.7 else None
+            subtasks = [
+                {"title": f"Step {s}", "completed": status == "done" or rng.random() < 0.4}
+                for s in range(rng.choice([0, 0, 0, 2, 3, 4, 6]))
+            ]
+            task_id = object_id(rng)
+            task_ids.append(task_id)
+            data["tasks"].append({
+                "id": task_id,
+                "title": f"Task {w}-{t}",
+                "description": "Lorem ipsum dolor sit amet. " * rng.randint(0, 20) or None,
+                "status": status,
+                "priority": priority,
+                "priority_rank": server.PRIORITY_RANK.index(priority),
+                "project_id": skewed_choice(rng, project_ids),
+                "workspace_id": workspace_id,
+                "assignee_id": assignee,
+                "due_date": due.isoformat() if due else None,
+                "subtasks": subtasks,
+                "ai_generated": bool(subtasks) and rng.random() < 0.3,
+                "version": rng.randint(1, 8),
+                "created_at": created.isoformat(),
+                "updated_at": updated.isoformat()
+            })
+
+        fixtures["workspaces"].append({
+            "id": workspace_id,
+            "members": [u["id"] for u in members],
+            "emails": [u["email"] for u in members],
+            "projects": project_ids,
+            "team_id": team_id,
+            "tasks": task_ids,
+            "invite_token": invite_token
+        })
+
+    # Users outside every workspace, consumed by invite, accept and password scenarios
+    for s in range(args.requests * 3):
+        scratch = user_doc(f"bench-scratch-{s}@example.com", f"Scratch {s}", [])
+        data["users"].append(scratch)
+        fixtures["scratch_users"].append({"id": scratch["id"], "email": scratch["email"]})
+
+    return data, fixtures
+
+
+async def seed(args, server) -> dict:
+    print("[INFO] Seeding benchmark data")
+    password_hash = await server.get_password_hash(BENCH_PASSWORD)
+    data, fixtures = generate(args, server, password_hash)
+
+    await server.ensure_indexes()
+    for collection, docs in data.items():
+        for start in range(0, len(docs), 1000):
+            await server.db[collection].insert_many([dict(d) for d in docs[start:start + 1000]])
+
+    # Rollups as the write path would have left them
+    by_workspace = {}
+    for task in data["tasks"]:
+        by_workspace.setdefault(task["workspace_id"], []).append((None, task))
+    for workspace_id, changes in by_workspace.items():
+        await server.db.workspace_stats.insert_one({"workspace_id": workspace_id})
+        await server.apply_stats_changes(workspace_id, changes)
+
+    # Move old done tasks to the archive like a long-running deployment
+    server.ARCHIVE_AFTER_DAYS = 90
+    archived = await server.archive_done_tasks()
+    server.ARCHIVE_AFTER_DAYS = 0
+    hot = set(await server.db.tasks.distinct("id"))
+    for workspace in fixtures["workspaces"]:
+        workspace["archived"] = [tid for tid in workspace["tasks"] if tid not in hot]
+        workspace["tasks"] = [tid for tid in workspace["tasks"] if tid in hot]
+
+    print(f"[INFO] Seeded {len(data['users'])} users, {len(data['tasks'])} tasks ({archived} archived)")
+    return fixtures
+
+
+def scenarios(args, fixtures, server) -> list:
+    """(name, build) pairs; build(i, rng) returns (method, path, request kwargs)"""
+    workspaces = fixtures["workspaces"]
+    scratch = fixtures["scratch_users"]
+    n = args.requests
+    tokens = {}
+
+    def auth(user_id: str) -> dict:
+        if user_id not in tokens:
+            tokens[user_id] = server.create_access_token(data={"sub": user_id})
+        return {"Authorization": f"Bearer {tokens[user_id]}"}
+
+    def member(rng):
+        workspace = skewed_choice(rng, workspaces)
+        return workspace, auth(rng.choice(workspace["members"]))
+
+    def admin(rng):
+        workspace = rng.choice(workspaces)
+        return workspace, auth(workspace["members"][0])
+
+    def read(path_fn, params_fn=None):
+        def build(i, rng):
+            workspace, headers = member(rng)
+            params = params_fn(workspace, rng) if params_fn else None
+            return "GET", path_fn(workspace, rng), {"headers": headers, "params": params}
+        return build
+
+    def new_task(workspace, rng, i):
+        return {
+            "title": f"Bench task {i}",
+            "description": "Created by the load benchmark",
+            "priority": rng.choice(list(PRIORITY_WEIGHTS)),
+            "project_id": rng.choice(workspace["projects"]),
+            "workspace_id": workspace["id"],
+            "assignee_id": rng.choice(workspace["members"])
+        }
+
+    created = []
+
+    def create_task(i, rng):
+        workspace, headers = member(rng)
+        return "POST", "/api/tasks", {"headers": headers, "json": new_task(workspace, rng, i)}
+
+    def update_task(i, rng):
+        workspace, headers = member(rng)
+        body = {"status": rng.choice(list(STATUS_WEIGHTS)), "title": f"Renamed {i}"}
+        return "PATCH", f"/api/tasks/{rng.choice(workspace['tasks'])}", {"headers": headers, "json": body}
+
+    def bulk_tasks(i, rng):
+        workspace, headers = member(rng)
+        operations = [{"op": "create", "create": new_task(workspace, rng, i)} for _ in range(5)]
+        operations += [
+            {"op": "update", "task_id": tid, "update": {"priority": rng.choice(list(PRIORITY_WEIGHTS))}}
+            for tid in rng.sample(workspace["tasks"], min(5, len(workspace["tasks"])))
+        ]
+        return "POST", "/api/tasks/bulk", {"headers": headers, "json": {"operations": operations}}
+
+    def delete_task(i, rng):
+        if not created:
+            workspace, headers = member(rng)
+            return "DELETE", f"/api/tasks/{rng.choice(workspace['tasks'])}", {"headers": headers}
+        task_id, headers = created[i % len(created)]
+        return "DELETE", f"/api/tasks/{task_id}", {"headers": headers}
+
+    def webhook(i, rng):
+        workspace = rng.choice(workspaces)
+        body = {
+            "event": "ai.task_complete",
+            "secret": os.environ.get("WEBHOOK_SECRET", "dev-webhook-secret"),
+            "data": {
+                "task_id": rng.choice(workspace["tasks"]),
+                "workspace_id": workspace["id"],
+                "subtasks": [{"title": f"AI step {s}", "completed": False} for s in range(3)]
+            }
+        }
+        # Every fourth delivery repeats an earlier key, like an upstream retry
+        key = f"bench-{i - i % 4 if i % 4 == 3 else i}"
+        return "POST", "/api/webhooks", {"json": body, "headers": {"Idempotency-Key": key}}
+
+    def generate_subtasks(i, rng):
+        # A small pool of titles, so most prompts after the first few are answered from the cache
+        workspace, headers = member(rng)
+        prompt = f"Break down this task into 3-5 actionable subtasks:\n\nTask: Bench task {rng.randrange(20)}"
+        return "POST", "/api/ai/generate-subtasks", {"headers": headers, "json": {"prompt": prompt}}
+
+    def login(i, rng):
+        workspace = rng.choice(workspaces)
+        email = rng.choice(workspace["emails"])
+        return "POST", "/api/auth/login", {"json": {"email": email, "password": BENCH_PASSWORD}}
+
+    def register(i, rng):
+        body = {"name": f"Registered {i}", "email": f"bench-register-{i}-{rng.getrandbits(32):x}@example.com", "password": BENCH_PASSWORD}
+        return "POST", "/api/auth/register", {"json": body}
+
+    def change_password(i, rng):
+        body = {"old_password": BENCH_PASSWORD, "new_password": BENCH_PASSWORD}
+        return "POST", "/api/auth/change-password", {"headers": auth(scratch[i % n]["id"]), "json": body}
+
+    def create_workspace(i, rng):
+        workspace, headers = member(rng)
+        return "POST", "/api/workspaces", {"headers": headers, "json": {"name": f"Bench extra {i}"}}
+
+    def invite_member(i, rng):
+        workspace, headers = admin(rng)
+        params = {"email": scratch[n + i % n]["email"]}
+        return "POST", f"/api/workspaces/{workspace['id']}/invite", {"headers": headers, "params": params}
+
+    def create_member(i, rng):
+        workspace, headers = admin(rng)
+        body = {"name": f"Added {i}", "email": f"bench-added-{i}-{rng.getrandbits(32):x}@example.com",
+                "password": BENCH_PASSWORD, "workspace_id": workspace["id"]}
+        return "POST", f"/api/workspaces/{workspace['id']}/members", {"headers": headers, "json": body}
+
+    def create_invite(i, rng):
+        workspace, headers = admin(rng)
+        return "POST", f"/api/workspaces/{workspace['id']}/invites", {"headers": headers, "json": {"workspace_id": workspace["id"]}}
+
+    def get_invite(i, rng):
+        return "GET", f"/api/invites/{rng.choice(workspaces)['invite_token']}", {}
+
+    def accept_invite(i, rng):
+        token = rng.choice(workspaces)["invite_token"]
+        return "POST", f"/api/invites/{token}/accept", {"headers": auth(scratch[2 * n + i % n]["id"])}
+
+    def create_project(i, rng):
+        workspace, headers = member(rng)
+        return "POST", "/api/projects", {"headers": headers, "json": {"name": f"Bench project {i}", "workspace_id": workspace["id"]}}
+
+    def create_team(i, rng):
+        workspace, headers = admin(rng)
+        body = {"name": f"Bench team {i}", "workspace_id": workspace["id"], "member_ids": rng.sample(workspace["members"], 3)}
+        return "POST", "/api/teams", {"headers": headers, "json": body}
+
+    def update_team(i, rng):
+        workspace, headers = admin(rng)
+        body = {"name": f"Team {i}", "workspace_id": workspace["id"], "member_ids": rng.sample(workspace["members"], 4)}
+        return "PATCH", f"/api/teams/{workspace['team_id']}", {"headers": headers, "json": body}
+
+    def archived_task(i, rng):
+        workspace, headers = member(rng)
+        task_id = rng.choice(workspace["archived"] or workspace["tasks"])
+        return "GET", f"/api/task/{task_id}", {"headers": headers, "params": {"archived": bool(workspace["archived"])}}
+
+    return [
+        # Reads
+        ("GET /api/workspaces", read(lambda w, r: "/api/workspaces")),
+        ("GET /api/workspaces/{id}/members", read(lambda w, r: f"/api/workspaces/{w['id']}/members")),
+        ("GET /api/projects/{id}", read(lambda w, r: f"/api/projects/{w['id']}")),
+        ("GET /api/teams/{id}", read(lambda w, r: f"/api/teams/{w['id']}")),
+        ("GET /api/tasks/{id}?project_id", read(lambda w, r: f"/api/tasks/{w['id']}", lambda w, r: {"project_id": r.choice(w["projects"])})),
+        ("GET /api/tasks/{id}?view=card", read(lambda w, r: f"/api/tasks/{w['id']}", lambda w, r: {"project_id": r.choice(w["projects"]), "view": "card"})),
+        ("GET /api/tasks/{id}?limit=100", read(lambda w, r: f"/api/tasks/{w['id']}", lambda w, r: {"limit": 100})),
+        ("GET /api/tasks/{id}?stream=ndjson", read(lambda w, r: f"/api/tasks/{w['id']}", lambda w, r: {"stream": "ndjson"})),
+        ("GET /api/task/{id}", read(lambda w, r: f"/api/task/{r.choice(w['tasks'])}")),
+        ("GET /api/task/{id}?archived", archived_task),
+        ("GET /api/tasks/{id}/archive", read(lambda w, r: f"/api/tasks/{w['id']}/archive", lambda w, r: {"limit": 100})),
+        ("GET /api/board/{id}", read(lambda w, r: f"/api/board/{w['id']}", lambda w, r: {"project_id": r.choice(w["projects"])})),
+        ("GET /api/tasks/{id}/changes", read(lambda w, r: f"/api/tasks/{w['id']}/changes", lambda w, r: {"since": 0})),
+        ("GET /api/me/tasks", read(lambda w, r: "/api/me/tasks")),
+        ("GET /api/me/tasks?sort=priority", read(lambda w, r: "/api/me/tasks", lambda w, r: {"sort": "priority"})),
+        ("GET /api/analytics/{id}", read(lambda w, r: f"/api/analytics/{w['id']}")),
+        ("GET /api/dashboard/{id}", read(lambda w, r: f"/api/dashboard/{w['id']}")),
+        ("GET /api/invites/{token}", get_invite),
+        # Writes
+        ("POST /api/tasks", create_task),
+        ("PATCH /api/tasks/{id}", update_task),
+        ("POST /api/tasks/bulk", bulk_tasks),
+        ("POST /api/webhooks", webhook),
+        ("POST /api/ai/generate-subtasks", generate_subtasks),
+        ("POST /api/projects", create_project),
+        ("POST /api/teams", create_team),
+        ("PATCH /api/teams/{id}", update_team),
+        ("POST /api/workspaces", create_workspace),
+        ("POST /api/workspaces/{id}/invites", create_invite),
+        ("POST /api/workspaces/{id}/invite", invite_member),
+        ("POST /api/invites/{token}/accept", accept_invite),
+        ("DELETE /api/tasks/{id}", delete_task),
+        # Password hashing bound
+        ("POST /api/auth/login", login),
+        ("POST /api/auth/register", register),
+        ("POST /api/auth/change-password", change_password),
+        ("POST /api/workspaces/{id}/members", create_member),
+    ], created
+
+
+def percentile(sorted_values: list, pct: float):
+    if not sorted_values:
+        return None
+    index = max(0, min(len(sorted_values) - 1, int(round(pct / 100 * len(sorted_values) + 0.5)) - 1))
+    return round(sorted_values[index], 3)
+
+
+def summarize(latencies_ms: list, wall_seconds: float, requests: int, errors: int, commands) -> dict:
+    latencies_ms = sorted(latencies_ms)
+    return {
+        "requests": requests,
+        "errors": errors,
+        "p50_ms": percentile(latencies_ms, 50),
+        "p95_ms": percentile(latencies_ms, 95),
+        "p99_ms": percentile(latencies_ms, 99),
+        "throughput_rps": round(requests / wall_seconds, 1) if wall_seconds else None,
+        "mongo_commands_per_request": round(commands / requests, 2) if commands is not None else None
+    }
+
+
+async def run_route(http, build, args, rng, counter):
+    """Issue args.requests requests from args.concurrency workers; returns the summary and responses"""
+    # Requests are built up front so the random draws do not depend on scheduling
+    pending = iter([build(i, rng) for i in range(args.requests)])
+    latencies, statuses, responses = [], {}, []
+
+    async def worker():
+        for method, path, kwargs in pending:
+            started = time.perf_counter()
+            response = await http.request(method, path, **kwargs)
+            latencies.append((time.perf_counter() - started) * 1000)
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+            responses.append(response)
+
+    commands_before = counter.count if counter else None
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+    wall = time.perf_counter() - started
+    commands = counter.count - commands_before if counter else None
+
+    errors = sum(count for status, count in statuses.items() if status >= 400)
+    summary = summarize(latencies, wall, args.requests, errors, commands)
+    summary["status_codes"] = {str(k): v for k, v in sorted(statuses.items())}
+    return summary, responses
+
+
+async def run_websocket_fanout(http, base_url, fixtures, args, rng, server):
+    """Connect ws_clients sockets to one workspace and time each broadcast until every socket has it"""
+    import websockets
+
+    workspace = fixtures["workspaces"][0]
+    token = server.create_access_token(data={'sub': workspace['members'][0]})
+    headers = {"Authorization": f"Bearer {token}"}
+    sent, received = {}, []
+    ws_url = base_url.replace("http://", "ws://") + f"/ws/{workspace['id']}?token={token}"
+
+    async def listen(connection):
+        async for raw in connection:
+            message = json.loads(raw)
+            title = (message.get("changes") or {}).get("title", "")
+            if message.get("type") == "task_updated" and title.startswith("ws-bench-"):
+                received.append((title, time.perf_counter()))
+
+    connections = [await websockets.connect(ws_url) for _ in range(args.ws_clients)]
+    listeners = [asyncio.create_task(listen(c)) for c in connections]
+
+    async def publish(i):
+        title = f"ws-bench-{i}"
+        sent[title] = time.perf_counter()
+        await http.patch(f"/api/tasks/{rng.choice(workspace['tasks'])}", json={"title": title}, headers=headers)
+
+    started = time.perf_counter()
+    for start in range(0, args.ws_events, args.concurrency):
+        await asyncio.gather(*(publish(i) for i in range(start, min(start + args.concurrency, args.ws_events))))
+    expected = args.ws_events * args.ws_clients
+    deadline = time.perf_counter() + 10
+    while len(received) < expected and time.perf_counter() < deadline:
+        await asyncio.sleep(0.05)
+    wall = time.perf_counter() - started
+
+    for listener in listeners:
+        listener.cancel()
+    for connection in connections:
+        await connection.close()
+
+    delivery = sorted((at - sent[title]) * 1000 for title, at in received if title in sent)
+    return {
+        "clients": args.ws_clients,
+        "events": args.ws_events,
+        "delivered": len(received),
+        "expected": expected,
+        "p50_ms": percentile(delivery, 50),
+        "p95_ms": percentile(delivery, 95),
+        "p99_ms": percentile(delivery, 99),
+        "deliveries_per_second": round(len(received) / wall, 1) if wall else None
+    }
+
+
+def compare(results: dict, baseline: dict, max_regression: float) -> list:
+    """Print a route-by-route comparison and return the routes whose p95 regressed too far"""
+    regressions = []
+    print(f"\n{'route':<42} {'p95 base':>9} {'p95 now':>9} {'change':>8} {'cmds base':>10} {'cmds now':>9}")
+    for name, now in results["routes"].items():
+        before = baseline.get("routes", {}).get(name)
+        if not before or not before.get("p95_ms") or now.get("p95_ms") is None:
+            print(f"{name:<42} {'-':>9} {now.get('p95_ms') or '-':>9}")
+            continue
+        change = (now["p95_ms"] - before["p95_ms"]) / before["p95_ms"]
+        print(f"{name:<42} {before['p95_ms']:>9} {now['p95_ms']:>9} {change:>+8.0%} "
+              f"{before.get('mongo_commands_per_request') or '-':>10} {now.get('mongo_commands_per_request') or '-':>9}")
+        more_commands = (now.get("mongo_commands_per_request") or 0) > (before.get("mongo_commands_per_request") or 0)
+        if change > max_regression or (more_commands and before.get("mongo_commands_per_request") is not None):
+            regressions.append(name)
+    return regressions
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+async def main(args):
+    import httpx
+    import uvicorn
+
+    # The archiver would move data mid-run; seeding archives once up front instead
+    os.environ["ARCHIVE_AFTER_DAYS"] = "0"
+    os.environ["BROADCAST_BACKEND"] = "memory"
+    counter = None
+    if args.fake:
+        os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+    else:
+        if "bench" not in args.db_name:
+            sys.exit("[ERROR] --db-name must contain 'bench'; it is dropped before seeding")
+        os.environ["MONGO_URL"] = args.mongo_url
+        os.environ["DB_NAME"] = args.db_name
+        counter = CommandCounter()
+        monitoring.register(counter)
+
+    import server
+
+    if args.fake:
+        from mongomock_motor import AsyncMongoMockClient
+
+        async def verify_conn():
+            print("[INFO] Using in-process mongomock")
+
+        server.client = AsyncMongoMockClient()
+        server.db = server.client[args.db_name]
+        server.verify_conn = verify_conn
+    else:
+        await server.client.drop_database(args.db_name)
+
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    logging.getLogger().setLevel(logging.WARNING)
+
+    fixtures = await seed(args, server)
+    rng = random.Random(args.seed + 1)
+
+    port = free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    # The fake's unsupported operators fail the same routes every run; keep their tracebacks quiet
+    log_level = "critical" if args.fake else "warning"
+    uv = uvicorn.Server(uvicorn.Config(server.app, host="127.0.0.1", port=port, log_level=log_level, ws="websockets"))
+    serving = asyncio.create_task(uv.serve())
+    while not uv.started:
+        await asyncio.sleep(0.05)
+
+    results = {
+        "meta": {
+            "seed": args.seed,
+            "workspaces": args.workspaces,
+            "members": args.members,
+            "tasks_per_workspace": args.tasks,
+            "requests_per_route": args.requests,
+            "concurrency": args.concurrency,
+            "backend": "mongomock" if args.fake else "mongod",
+            "python": platform.python_version(),
+            "started_at": datetime.now(timezone.utc).isoformat()
+        },
+        "routes": {}
+    }
+
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as http:
+        route_list, created = scenarios(args, fixtures, server)
+        for name, build in route_list:
+            summary, responses = await run_route(http, build, args, rng, counter)
+            results["routes"][name] = summary
+            print(f"[INFO] {name:<42} p50 {summary['p50_ms']}ms  p95 {summary['p95_ms']}ms  "
+                  f"{summary['throughput_rps']} req/s  {summary['mongo_commands_per_request']} cmds/req  "
+                  f"{summary['errors']} errors")
+            if name == "POST /api/tasks":
+                # Tasks created here are what the delete scenario removes
+                for response in responses:
+                    if response.status_code < 400:
+                        task = response.json()["task"]
+                        token = server.create_access_token(data={"sub": task["assignee_id"]})
+                        created.append((task["id"], {"Authorization": f"Bearer {token}"}))
+
+        results["websocket"] = await run_websocket_fanout(http, base_url, fixtures, args, rng, server)
+        print(f"[INFO] WebSocket fan-out: {results['websocket']}")
+
+    uv.should_exit = True
+    await serving
+
+    with open(args.out, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"[INFO] Results written to {args.out}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.max_regression)
+        if regressions:
+            print(f"[ERROR] {len(regressions)} route(s) regressed: {', '.join(regressions)}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main(parse_args()))
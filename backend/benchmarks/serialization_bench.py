@@ -0,0 +1,90 @@
+"""
+Micro-benchmark: encoding a 5,000-task board.
+
+Compares the previous response path (serialize_doc copy, FastAPI's
+jsonable_encoder, stdlib json) with the single-pass dumps() encoder used by
+FastJSONResponse and the WebSocket broadcaster.
+
+    cd backend
+    python benchmarks/serialization_bench.py [--tasks 5000] [--repeat 5]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from bson import ObjectId
+from fastapi.encoders import jsonable_encoder
+from starlette.responses import JSONResponse
+
+from server import FastJSONResponse, serialize_doc
+
+
+def make_board(count: int) -> list:
+    rng = random.Random(42)
+    now = datetime.now(timezone.utc)
+    members = [{"id": str(ObjectId()), "name": f"Member {i}", "email": f"m{i}@example.com",
+                "avatar": f"https://api.dicebear.com/7.x/avataaars/svg?seed=m{i}"} for i in range(25)]
+    tasks = []
+    for i in range(count):
+        assignee = rng.choice(members)
+        updated = now - timedelta(minutes=rng.randint(0, 60 * 24 * 90))
+        tasks.append({
+            "id": str(ObjectId()),
+            "title": f"Task {i}",
+            "description": "Lorem ipsum dolor sit amet " * rng.randint(1, 12),
+            "status": rng.choice(["todo", "in_progress", "review", "done"]),
+            "priority": rng.choice(["low", "medium", "high", "urgent"]),
+            "project_id": "p1",
+            "workspace_id": "w1",
+            "assignee_id": assignee["id"],
+            "assignee": assignee,
+            "due_date": (updated + timedelta(days=7)).isoformat(),
+            "subtasks": [{"title": f"Step {j}", "completed": rng.random() < 0.5} for j in range(rng.randint(0, 6))],
+            "ai_generated": False,
+            "version": rng.randint(1, 20),
+            "created_at": updated.isoformat(),
+            "updated_at": updated.isoformat()
+        })
+    return tasks
+
+
+def legacy_render(tasks: list) -> bytes:
+    return JSONResponse(jsonable_encoder({"tasks": serialize_doc(tasks)})).body
+
+
+def fast_render(tasks: list) -> bytes:
+    return FastJSONResponse({"tasks": tasks}).body
+
+
+def best_of(fn, tasks: list, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn(tasks)
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tasks", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    tasks = make_board(args.tasks)
+    legacy = best_of(legacy_render, tasks, args.repeat)
+    fast = best_of(fast_render, tasks, args.repeat)
+
+    print(f"tasks:   {args.tasks} ({len(fast_render(tasks)) / 1024:.0f} KiB encoded)")
+    print(f"legacy:  {legacy * 1000:8.1f} ms  (serialize_doc + jsonable_encoder + json)")
+    print(f"fast:    {fast * 1000:8.1f} ms  (dumps)")
+    print(f"speedup: {legacy / fast:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
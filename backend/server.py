@@ -1,21 +1,36 @@
 # Import your other dependencies here...
-from fastapi import FastAPI, APIRouter, HTTPException, Depends, Header, WebSocket, WebSocketDisconnect, BackgroundTasks
+from fastapi import FastAPI, APIRouter, HTTPException, Depends, Header, Query, Response, WebSocket, WebSocketDisconnect, BackgroundTasks
 from contextlib import asynccontextmanager
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
+from starlette.routing import Match
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ASCENDING, DeleteOne, IndexModel, InsertOne, ReplaceOne, ReturnDocument, UpdateOne, WriteConcern, monitoring
+from pymongo.errors import BulkWriteError, DuplicateKeyError, OperationFailure
 import os
 import logging
 from pathlib import Path
+from urllib.parse import parse_qs, unquote
 from pydantic import BaseModel, Field, ConfigDict, EmailStr
 from typing import List, Optional, Dict, Any
 from datetime import datetime, timezone, timedelta
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from bson import ObjectId
+import asyncio
+import base64
+import hashlib
 import json
+import random
+import re
 import secrets
+import threading
+import time
+from bisect import bisect_left
+from collections import OrderedDict, deque
+from contextvars import ContextVar
+from concurrent.futures import ThreadPoolExecutor
 from enum import Enum
 
 ROOT_DIR = Path(__file__).parent
@@ -29,6 +44,152 @@ allow_origins=[
     "http://127.0.0.1:3000"
 ]
 
+# Metrics
+SLOW_REQUEST_MS = float(os.environ.get('SLOW_REQUEST_MS', 500))
+SLOW_REQUEST_DB_CALLS = int(os.environ.get('SLOW_REQUEST_DB_CALLS', 25))
+# The same command on the same collection this often in one request is reported as a likely N+1
+N_PLUS_ONE_THRESHOLD = int(os.environ.get('N_PLUS_ONE_THRESHOLD', 5))
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN')
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COMMAND_COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55)
+
+def format_labels(names: tuple, values: tuple) -> str:
+    escaped = (str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for v in values)
+    return ",".join(f'{name}="{value}"' for name, value in zip(names, escaped))
+
+class Counter:
+    """Monotonic counter per label set, rendered in Prometheus text format"""
+    def __init__(self, name: str, help_text: str, labels: tuple = ()):
+        self.name = name
+        self.help_text = help_text
+        self.labels = labels
+        self.values: Dict[tuple, float] = {}
+        self.lock = threading.Lock()
+
+    def inc(self, *label_values, amount: float = 1):
+        with self.lock:
+            self.values[label_values] = self.values.get(label_values, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        for label_values, value in sorted(self.values.items()):
+            labels = format_labels(self.labels, label_values)
+            lines.append(f"{self.name}{{{labels}}} {value}" if labels else f"{self.name} {value}")
+        return lines
+
+class Histogram:
+    """Bucketed observations per label set, rendered in Prometheus text format"""
+    def __init__(self, name: str, help_text: str, labels: tuple, buckets: tuple):
+        self.name = name
+        self.help_text = help_text
+        self.labels = labels
+        self.buckets = buckets
+        # label values -> per-bucket counts, then sum and count
+        self.series: Dict[tuple, list] = {}
+        self.lock = threading.Lock()
+
+    def observe(self, value: float, *label_values):
+        with self.lock:
+            series = self.series.get(label_values)
+            if series is None:
+                series = self.series[label_values] = [0] * len(self.buckets) + [0.0, 0]
+            index = bisect_left(self.buckets, value)
+            if index < len(self.buckets):
+                series[index] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        for label_values, series in sorted(self.series.items()):
+            labels = format_labels(self.labels, label_values)
+            prefix = labels + "," if labels else ""
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{{{prefix}le="{bound}"}} {cumulative}')
+            lines.append(f'{self.name}_bucket{{{prefix}le="+Inf"}} {series[-1]}')
+            suffix = f"{{{labels}}}" if labels else ""
+            lines.append(f"{self.name}_sum{suffix} {series[-2]}")
+            lines.append(f"{self.name}_count{suffix} {series[-1]}")
+        return lines
+
+http_request_seconds = Histogram(
+    "devpulse_http_request_duration_seconds", "HTTP request latency by route",
+    ("method", "route", "status"), LATENCY_BUCKETS
+)
+request_mongo_commands = Histogram(
+    "devpulse_http_request_mongo_commands", "MongoDB commands issued per HTTP request",
+    ("method", "route"), COMMAND_COUNT_BUCKETS
+)
+request_mongo_seconds = Histogram(
+    "devpulse_http_request_mongo_seconds", "Time spent in MongoDB commands per HTTP request",
+    ("method", "route"), LATENCY_BUCKETS
+)
+n_plus_one_requests = Counter(
+    "devpulse_http_request_n_plus_one_total", "Requests that repeated one command on one collection at least N_PLUS_ONE_THRESHOLD times",
+    ("method", "route")
+)
+mongo_command_seconds = Histogram(
+    "devpulse_mongo_command_duration_seconds", "MongoDB command latency, including background work",
+    ("command",), LATENCY_BUCKETS
+)
+mongo_command_failures = Counter("devpulse_mongo_command_failures_total", "Failed MongoDB commands", ("command",))
+webhook_events = Counter("devpulse_webhook_events_total", "Webhook deliveries by outcome", ("outcome",))
+webhook_batch_size = Histogram(
+    "devpulse_webhook_batch_size", "Webhook events applied per batch",
+    (), (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000)
+)
+webhook_apply_lag_seconds = Histogram(
+    "devpulse_webhook_apply_lag_seconds", "Time from a webhook being queued to it being applied",
+    (), LATENCY_BUCKETS
+)
+ws_delivery_seconds = Histogram(
+    "devpulse_ws_delivery_seconds", "Time from broadcast to the message being written to each socket",
+    ("workspace",), LATENCY_BUCKETS
+)
+
+class RequestMetrics:
+    """MongoDB work attributed to the request running in the current context"""
+    __slots__ = ("commands", "command_seconds", "shapes")
+
+    def __init__(self):
+        self.commands = 0
+        self.command_seconds = 0.0
+        # "command collection" -> times issued
+        self.shapes: Dict[str, int] = {}
+
+current_request: ContextVar[Optional[RequestMetrics]] = ContextVar("current_request", default=None)
+
+class MongoCommandMonitor(monitoring.CommandListener):
+    """Counts and times every command; Motor runs them in copies of the caller's context"""
+    def started(self, event):
+        request = current_request.get()
+        if request is None:
+            return
+        target = event.command.get(event.command_name)
+        collection = target if isinstance(target, str) else event.command.get("collection", "")
+        shape = f"{event.command_name} {collection}"
+        request.commands += 1
+        request.shapes[shape] = request.shapes.get(shape, 0) + 1
+
+    def succeeded(self, event):
+        self.finished(event)
+
+    def failed(self, event):
+        mongo_command_failures.inc(event.command_name)
+        self.finished(event)
+
+    def finished(self, event):
+        seconds = event.duration_micros / 1_000_000
+        mongo_command_seconds.observe(seconds, event.command_name)
+        request = current_request.get()
+        if request is not None:
+            request.command_seconds += seconds
+
+command_monitor = MongoCommandMonitor()
+
 # MongoDB connection with fallback
 try:
     mongo_url = os.environ.get('MONGO_URL', 'mongodb://localhost:27017')
@@ -46,7 +207,8 @@ try:
                 tls=True,
                 tlsAllowInvalidCertificates=True,
                 retryWrites=True,
-                w='majority'
+                w='majority',
+                event_listeners=[command_monitor]
             )
         except ImportError:
             client = AsyncIOMotorClient(
@@ -56,11 +218,12 @@ try:
                 socketTimeoutMS=30000,
                 tls=True,
                 tlsAllowInvalidCertificates=True,
-                retryWrites=True
+                retryWrites=True,
+                event_listeners=[command_monitor]
             )
     else:
         # Local MongoDB
-        client = AsyncIOMotorClient(mongo_url, serverSelectionTimeoutMS=5000)
+        client = AsyncIOMotorClient(mongo_url, serverSelectionTimeoutMS=5000, event_listeners=[command_monitor])
     
     db = client[db_name]
     print(f"[INFO] Connecting to MongoDB database: {db_name}")
@@ -81,46 +244,493 @@ except Exception as e:
     raise
 
 # Security
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+BCRYPT_ROUNDS = int(os.environ.get('BCRYPT_ROUNDS', 12))
+PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS', 2))
+PASSWORD_HASH_QUEUE_SIZE = int(os.environ.get('PASSWORD_HASH_QUEUE_SIZE', 32))
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=BCRYPT_ROUNDS)
+
+class PasswordHasher:
+    """Runs bcrypt in a bounded thread pool so it never blocks the event loop"""
+    def __init__(self, workers: int, queue_size: int):
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bcrypt")
+        self.max_pending = workers + queue_size
+        self.pending = 0
+        self.calls = 0
+        self.rejected = 0
+        self.queued_seconds = 0.0
+        self.hashing_seconds = 0.0
+
+    async def run(self, fn, *args):
+        # Shed load instead of letting a login burst queue up unbounded
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            raise HTTPException(status_code=503, detail="Server busy, please retry")
+        
+        def timed():
+            started = time.perf_counter()
+            result = fn(*args)
+            return started, time.perf_counter(), result
+        
+        self.pending += 1
+        submitted = time.perf_counter()
+        try:
+            started, finished, result = await asyncio.get_running_loop().run_in_executor(self.executor, timed)
+        finally:
+            self.pending -= 1
+        self.calls += 1
+        self.queued_seconds += started - submitted
+        self.hashing_seconds += finished - started
+        return result
+
+    def stats(self) -> dict:
+        return {
+            "pending": self.pending,
+            "calls": self.calls,
+            "rejected": self.rejected,
+            "queued_seconds": round(self.queued_seconds, 6),
+            "hashing_seconds": round(self.hashing_seconds, 6)
+        }
+
+password_hasher = PasswordHasher(PASSWORD_HASH_WORKERS, PASSWORD_HASH_QUEUE_SIZE)
 SECRET_KEY = os.environ.get('JWT_SECRET', 'dev-secret-key-change-in-production')
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24 * 7  # 7 days
 
+# Auth cache
+# Invalidation is per worker, so on other workers a membership or password change
+# takes effect within AUTH_CACHE_TTL_SECONDS (0 disables caching). Admin checks and
+# password changes always read from MongoDB.
+AUTH_CACHE_TTL_SECONDS = float(os.environ.get('AUTH_CACHE_TTL_SECONDS', 30))
+AUTH_CACHE_MAX_SIZE = int(os.environ.get('AUTH_CACHE_MAX_SIZE', 10000))
+
+class TTLCache:
+    """Bounded LRU cache whose entries expire after a TTL"""
+    def __init__(self, max_size: int, ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+
+    def get(self, key: str):
+        entry = self._entries.get(key)
+        if entry is None or entry[0] <= time.monotonic():
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def set(self, key: str, value, ttl: Optional[float] = None):
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, key: str):
+        self._entries.pop(key, None)
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        return {"size": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+# token -> user id, user id -> user doc, workspace id -> membership
+token_cache = TTLCache(AUTH_CACHE_MAX_SIZE, AUTH_CACHE_TTL_SECONDS)
+principal_cache = TTLCache(AUTH_CACHE_MAX_SIZE, AUTH_CACHE_TTL_SECONDS)
+membership_cache = TTLCache(AUTH_CACHE_MAX_SIZE, AUTH_CACHE_TTL_SECONDS)
+
+def invalidate_user(user_id: str):
+    principal_cache.invalidate(user_id)
+
+def invalidate_workspace(workspace_id: str):
+    membership_cache.invalidate(workspace_id)
+
+# Broadcast backends
+BROADCAST_BACKEND = os.environ.get('BROADCAST_BACKEND', 'memory')
+# Messages waiting to be written for other workers; publishing fails once this many are queued
+BROADCAST_QUEUE_SIZE = int(os.environ.get('BROADCAST_QUEUE_SIZE', 10000))
+BROADCAST_BATCH_SIZE = int(os.environ.get('BROADCAST_BATCH_SIZE', 100))
+
+class BroadcastBackend:
+    """Carries encoded messages between workers; each worker delivers to its own sockets"""
+    # Messages accepted by publish() that never reached the other workers
+    failures = 0
+
+    def bind(self, deliver):
+        self.deliver = deliver
+
+    async def start(self):
+        pass
+
+    async def publish(self, workspace_id: str, text: str):
+        raise NotImplementedError
+
+    async def stop(self):
+        pass
+
+class InMemoryBroadcast(BroadcastBackend):
+    """Single-process backend: publishing is local delivery"""
+    async def publish(self, workspace_id: str, text: str):
+        self.deliver(workspace_id, text)
+
+class MongoChangeStreamBroadcast(BroadcastBackend):
+    """Cross-worker backend: messages are inserted into a collection every worker watches"""
+    def __init__(self, collection):
+        self.collection = collection
+        self.origin = str(ObjectId())
+        self.listener: Optional[asyncio.Task] = None
+        self.publisher: Optional[asyncio.Task] = None
+        self.outbox: asyncio.Queue = asyncio.Queue(maxsize=BROADCAST_QUEUE_SIZE)
+
+    async def start(self):
+        self.listener = asyncio.create_task(self.listen())
+        self.publisher = asyncio.create_task(self.write_outbox())
+
+    async def publish(self, workspace_id: str, text: str):
+        # Deliver locally right away; the change stream skips our own inserts
+        self.deliver(workspace_id, text)
+        # The insert for other workers happens off the request path
+        self.outbox.put_nowait({
+            "workspace_id": workspace_id,
+            "message": text,
+            "origin": self.origin,
+            "created_at": datetime.now(timezone.utc)
+        })
+
+    async def write_outbox(self):
+        """Insert queued messages in order, as many per round trip as have piled up"""
+        while True:
+            docs = [await self.outbox.get()]
+            while len(docs) < BROADCAST_BATCH_SIZE and not self.outbox.empty():
+                docs.append(self.outbox.get_nowait())
+            try:
+                await self.collection.insert_many(docs, ordered=True)
+            except Exception as e:
+                # Clients on other workers catch up from the change log when they reconnect
+                self.failures += len(docs)
+                logging.error(f"Broadcast publish of {len(docs)} messages failed: {e}")
+            finally:
+                for _ in docs:
+                    self.outbox.task_done()
+
+    async def listen(self):
+        pipeline = [{"$match": {"operationType": "insert", "fullDocument.origin": {"$ne": self.origin}}}]
+        resume_token = None
+        while True:
+            try:
+                async with self.collection.watch(pipeline, resume_after=resume_token) as stream:
+                    async for change in stream:
+                        resume_token = stream.resume_token
+                        doc = change["fullDocument"]
+                        self.deliver(doc["workspace_id"], doc["message"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logging.error(f"Broadcast change stream failed: {e}")
+                if isinstance(e, OperationFailure):
+                    # The resume point may have aged out of the oplog
+                    resume_token = None
+                await asyncio.sleep(1)
+
+    async def stop(self):
+        if self.listener:
+            self.listener.cancel()
+        if self.publisher:
+            # Give queued messages a moment to go out before shutting down
+            try:
+                await asyncio.wait_for(self.outbox.join(), 5)
+            except asyncio.TimeoutError:
+                logging.error(f"Dropping {self.outbox.qsize()} unpublished broadcast messages on shutdown")
+            self.publisher.cancel()
+
+def create_broadcast_backend() -> BroadcastBackend:
+    if BROADCAST_BACKEND == "mongo":
+        return MongoChangeStreamBroadcast(db.broadcasts)
+    return InMemoryBroadcast()
+
 # WebSocket connection manager
+WS_SEND_QUEUE_SIZE = int(os.environ.get('WS_SEND_QUEUE_SIZE', 256))
+
+class ClientConnection:
+    """A socket plus its bounded outbound queue, drained by a dedicated writer task"""
+    def __init__(self, websocket: WebSocket, workspace_id: str):
+        self.websocket = websocket
+        self.workspace_id = workspace_id
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=WS_SEND_QUEUE_SIZE)
+        self.writer: Optional[asyncio.Task] = None
+
+    async def drain(self, manager: "ConnectionManager"):
+        try:
+            while True:
+                text, queued_at = await self.queue.get()
+                await self.websocket.send_text(text)
+                ws_delivery_seconds.observe(time.perf_counter() - queued_at, self.workspace_id)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            # The socket is gone; stop routing messages to it
+            manager.disconnect(self.websocket, self.workspace_id)
+
 class ConnectionManager:
     def __init__(self):
-        self.active_connections: Dict[str, List[WebSocket]] = {}
-
-    async def connect(self, websocket: WebSocket, workspace_id: str):
+        self.active_connections: Dict[str, Dict[WebSocket, ClientConnection]] = {}
+        self.dropped = 0
+        self.publish_failures = 0
+        # Held so pending closes aren't garbage collected mid-flight
+        self.closing: set = set()
+        self.backend: BroadcastBackend = InMemoryBroadcast()
+        self.backend.bind(self.deliver_local)
+
+    async def use_backend(self, backend: BroadcastBackend):
+        await self.backend.stop()
+        backend.bind(self.deliver_local)
+        await backend.start()
+        self.backend = backend
+
+    async def connect(self, websocket: WebSocket, workspace_id: str, backlog=None):
         await websocket.accept()
-        if workspace_id not in self.active_connections:
-            self.active_connections[workspace_id] = []
-        self.active_connections[workspace_id].append(websocket)
+        connection = ClientConnection(websocket, workspace_id)
+        self.active_connections.setdefault(workspace_id, {})[websocket] = connection
+        if backlog is not None:
+            # Live messages queue up while the backlog loads; replay goes out ahead of them
+            replay = await backlog()
+            live = []
+            while not connection.queue.empty():
+                live.append(connection.queue.get_nowait())
+            for item in [(dumps(replay).decode(), time.perf_counter())] + live:
+                connection.queue.put_nowait(item)
+        connection.writer = asyncio.create_task(connection.drain(self))
 
     def disconnect(self, websocket: WebSocket, workspace_id: str):
-        if workspace_id in self.active_connections:
-            self.active_connections[workspace_id].remove(websocket)
+        connections = self.active_connections.get(workspace_id, {})
+        connection = connections.pop(websocket, None)
+        if not connections:
+            self.active_connections.pop(workspace_id, None)
+        if connection and connection.writer and connection.writer is not asyncio.current_task():
+            connection.writer.cancel()
+
+    def drop_slow_consumer(self, connection: ClientConnection):
+        """Evict a client whose queue overflowed; it must reconnect and refetch"""
+        self.dropped += 1
+        self.disconnect(connection.websocket, connection.workspace_id)
+        task = asyncio.create_task(self._close(connection.websocket))
+        self.closing.add(task)
+        task.add_done_callback(self.closing.discard)
+
+    async def _close(self, websocket: WebSocket):
+        try:
+            await websocket.close(code=1013)
+        except Exception:
+            pass
 
     async def broadcast_to_workspace(self, workspace_id: str, message: dict):
-        if workspace_id in self.active_connections:
-            for connection in self.active_connections[workspace_id]:
-                try:
-                    await connection.send_json(message)
-                except:
-                    pass
+        """Encode once and publish to every worker through the broadcast backend"""
+        try:
+            await self.backend.publish(workspace_id, dumps(message).decode())
+        except Exception as e:
+            # The write being announced has already committed; clients catch up from the change log
+            self.publish_failures += 1
+            logging.error(f"Broadcast to workspace {workspace_id} failed: {e}")
+
+    def deliver_local(self, workspace_id: str, text: str):
+        """Enqueue for every socket on this worker without waiting for delivery"""
+        connections = self.active_connections.get(workspace_id)
+        if not connections:
+            return
+        queued_at = time.perf_counter()
+        for connection in list(connections.values()):
+            try:
+                connection.queue.put_nowait((text, queued_at))
+            except asyncio.QueueFull:
+                self.drop_slow_consumer(connection)
 
 manager = ConnectionManager()
 
 
 
+# Index provisioning
+CHANGE_LOG_RETENTION_HOURS = int(os.environ.get('CHANGE_LOG_RETENTION_HOURS', 24))
+WEBHOOK_RETENTION_HOURS = int(os.environ.get('WEBHOOK_RETENTION_HOURS', 24))
+
+INDEXES = {
+    "users": [
+        IndexModel([("id", ASCENDING)], unique=True),
+        IndexModel([("email", ASCENDING)], unique=True)
+    ],
+    "workspaces": [
+        IndexModel([("id", ASCENDING)], unique=True),
+        IndexModel([("members.user_id", ASCENDING)])
+    ],
+    "tasks": [
+        IndexModel([("id", ASCENDING)], unique=True),
+        IndexModel([("workspace_id", ASCENDING), ("updated_at", ASCENDING), ("id", ASCENDING)]),
+        IndexModel([("workspace_id", ASCENDING), ("project_id", ASCENDING), ("updated_at", ASCENDING), ("id", ASCENDING)]),
+        IndexModel([("assignee_id", ASCENDING), ("status", ASCENDING), ("due_date", ASCENDING)]),
+        # Kanban columns: top-N per status in board order
+        IndexModel([
+            ("workspace_id", ASCENDING), ("project_id", ASCENDING), ("status", ASCENDING),
+            ("priority_rank", ASCENDING), ("due_date", ASCENDING), ("id", ASCENDING)
+        ]),
+        # Archival candidates only; open tasks never enter this index
+        IndexModel([("updated_at", ASCENDING), ("id", ASCENDING)], partialFilterExpression={"status": "done"}),
+        # AI subtask jobs still waiting for a worker, requeued on startup
+        IndexModel([("ai_status", ASCENDING), ("created_at", ASCENDING)], partialFilterExpression={"ai_status": "pending"})
+    ],
+    "tasks_archive": [
+        IndexModel([("id", ASCENDING)], unique=True),
+        IndexModel([("workspace_id", ASCENDING), ("updated_at", ASCENDING), ("id", ASCENDING)]),
+        IndexModel([("workspace_id", ASCENDING), ("project_id", ASCENDING), ("updated_at", ASCENDING), ("id", ASCENDING)])
+    ],
+    "projects": [
+        IndexModel([("workspace_id", ASCENDING), ("team_id", ASCENDING)])
+    ],
+    "teams": [
+        IndexModel([("id", ASCENDING)], unique=True),
+        IndexModel([("workspace_id", ASCENDING)])
+    ],
+    "invites": [
+        IndexModel([("token", ASCENDING)], unique=True),
+        # Mongo removes invites once expires_at has passed
+        IndexModel([("expires_at", ASCENDING)], expireAfterSeconds=0)
+    ],
+    "workspace_stats": [
+        IndexModel([("workspace_id", ASCENDING)], unique=True)
+    ],
+    "workspace_revisions": [
+        IndexModel([("workspace_id", ASCENDING)], unique=True)
+    ],
+    "task_changes": [
+        IndexModel([("workspace_id", ASCENDING), ("seq", ASCENDING)], unique=True),
+        # Compaction: old entries expire and resuming clients past them get reset=True
+        IndexModel([("created_at", ASCENDING)], expireAfterSeconds=CHANGE_LOG_RETENTION_HOURS * 3600)
+    ],
+    "webhook_events": [
+        IndexModel([("status", ASCENDING), ("received_at", ASCENDING)]),
+        IndexModel([("claim", ASCENDING)], sparse=True),
+        # _id is the idempotency key; applied events stay long enough to absorb redeliveries
+        IndexModel([("applied_at", ASCENDING)], expireAfterSeconds=WEBHOOK_RETENTION_HOURS * 3600)
+    ],
+    "broadcasts": [
+        # Messages only matter to workers that are watching right now
+        IndexModel([("created_at", ASCENDING)], expireAfterSeconds=300)
+    ]
+}
+
+# Representative shape of every query the API issues, checked with explain()
+QUERY_CATALOGUE = [
+    {"find": "users", "filter": {"id": "u"}},
+    {"find": "users", "filter": {"email": "e"}},
+    {"find": "users", "filter": {"id": {"$in": ["u1", "u2"]}}},
+    {"find": "workspaces", "filter": {"id": "w"}},
+    {"find": "workspaces", "filter": {"members.user_id": "u"}},
+    {"find": "tasks", "filter": {"id": "t"}},
+    {"find": "tasks", "filter": {"workspace_id": "w"}, "sort": {"updated_at": 1, "id": 1}},
+    {"find": "tasks", "filter": {"workspace_id": "w", "project_id": "p"}, "sort": {"updated_at": 1, "id": 1}},
+    {"find": "tasks", "filter": {"assignee_id": "u", "workspace_id": {"$in": ["w"]}}, "sort": {"due_date": 1, "id": 1}},
+    {"find": "tasks", "filter": {"assignee_id": "u", "status": {"$in": ["todo"]}, "workspace_id": {"$in": ["w"]}}},
+    {"find": "tasks", "filter": {"workspace_id": "w", "project_id": "p", "status": "todo"}, "sort": {"priority_rank": 1, "due_date": 1, "id": 1}},
+    {"find": "tasks", "filter": {"status": "done", "updated_at": {"$lt": "t"}}, "sort": {"updated_at": 1, "id": 1}},
+    {"find": "tasks", "filter": {"ai_status": "pending"}, "sort": {"created_at": 1}},
+    {"find": "webhook_events", "filter": {"status": "queued"}, "sort": {"received_at": 1}},
+    {"find": "webhook_events", "filter": {"claim": "c"}, "sort": {"received_at": 1}},
+    {"find": "tasks_archive", "filter": {"id": "t"}},
+    {"find": "tasks_archive", "filter": {"workspace_id": "w", "project_id": "p"}, "sort": {"updated_at": 1, "id": 1}},
+    {"find": "projects", "filter": {"workspace_id": "w"}},
+    {"find": "projects", "filter": {"workspace_id": "w", "team_id": "t"}},
+    {"find": "teams", "filter": {"id": "t"}},
+    {"find": "teams", "filter": {"workspace_id": "w"}},
+    {"find": "invites", "filter": {"token": "t"}},
+    {"find": "workspace_stats", "filter": {"workspace_id": "w"}},
+    {"find": "workspace_revisions", "filter": {"workspace_id": "w"}},
+    {"find": "task_changes", "filter": {"workspace_id": "w", "seq": {"$gt": 0}}, "sort": {"seq": 1}},
+    {"aggregate": "tasks", "pipeline": [{"$match": {"workspace_id": "w"}}], "cursor": {}}
+]
+
+async def duplicate_keys(collection: str, keys: List[str], limit: int = 5) -> List[dict]:
+    """Key values held by more than one document, which block a unique index"""
+    return await db[collection].aggregate([
+        {"$group": {"_id": {key.replace(".", "_"): f"${key}" for key in keys}, "count": {"$sum": 1}}},
+        {"$match": {"count": {"$gt": 1}}},
+        {"$limit": limit}
+    ]).to_list(limit)
+
+async def ensure_indexes() -> List[str]:
+    """Create every declared index; safe to run on each startup. Returns the indexes that failed"""
+    failed = []
+    for collection, indexes in INDEXES.items():
+        # One at a time, so an index that can't be built doesn't take the rest of the collection's with it
+        for index in indexes:
+            name = f"{collection}.{index.document['name']}"
+            try:
+                await db[collection].create_indexes([index])
+            except OperationFailure as e:
+                failed.append(name)
+                logging.error(f"Index provisioning failed for {name}: {e}")
+                if index.document.get("unique"):
+                    for dup in await duplicate_keys(collection, list(index.document["key"])):
+                        logging.error(f"Duplicate key in {collection}: {dup['_id']} held by {dup['count']} documents")
+    return failed
+
+async def backfill_priority_rank():
+    """Give tasks written before priority_rank existed their board sort key"""
+    for rank, priority in enumerate(PRIORITY_RANK):
+        result = await db.tasks.update_many(
+            {"priority": priority, "priority_rank": {"$exists": False}},
+            {"$set": {"priority_rank": rank}}
+        )
+        if result.modified_count:
+            print(f"[INFO] Backfilled priority_rank on {result.modified_count} {priority} tasks")
+
+def winning_plan_stages(explain: Any) -> List[str]:
+    """Every stage name inside the winning plans of an explain() result"""
+    stages = []
+    def walk(node, in_plan):
+        if isinstance(node, dict):
+            if in_plan and "stage" in node:
+                stages.append(node["stage"])
+            for key, value in node.items():
+                if key != "rejectedPlans":
+                    walk(value, in_plan or key in ("winningPlan", "queryPlan"))
+        elif isinstance(node, list):
+            for item in node:
+                walk(item, in_plan)
+    walk(explain, False)
+    return stages
+
+async def find_collection_scans() -> List[dict]:
+    """Explain every catalogued query and return the ones planned as a COLLSCAN"""
+    offenders = []
+    for command in QUERY_CATALOGUE:
+        explain = await db.command({"explain": command, "verbosity": "queryPlanner"})
+        if "COLLSCAN" in winning_plan_stages(explain):
+            offenders.append(command)
+    return offenders
+
 # Lifespan event handler
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
     await verify_conn()
+    await ensure_indexes()
+    await backfill_priority_rank()
+    await manager.use_backend(create_broadcast_backend())
+    archiver = asyncio.create_task(run_archiver()) if ARCHIVE_AFTER_DAYS > 0 else None
+    await ai_jobs.start()
+    webhook_applier.start()
     yield
     # Shutdown
+    if archiver:
+        archiver.cancel()
+    await ai_jobs.stop()
+    await webhook_applier.stop()
+    await manager.backend.stop()
     client.close()
+    password_hasher.executor.shutdown(wait=False)
 
 # Enums
 class TaskStatus(str, Enum):
@@ -135,6 +745,9 @@ class TaskPriority(str, Enum):
     HIGH = "high"
     URGENT = "urgent"
 
+# Most urgent first; stored on tasks as priority_rank so indexes can sort by it
+PRIORITY_RANK = [p.value for p in (TaskPriority.URGENT, TaskPriority.HIGH, TaskPriority.MEDIUM, TaskPriority.LOW)]
+
 class Role(str, Enum):
     ADMIN = "admin"
     MEMBER = "member"
@@ -261,6 +874,28 @@ class TaskResponse(BaseModel):
     created_at: datetime
     updated_at: datetime
 
+class BulkTaskOp(str, Enum):
+    CREATE = "create"
+    UPDATE = "update"
+    DELETE = "delete"
+
+class BulkTaskItem(BaseModel):
+    op: BulkTaskOp
+    task_id: Optional[str] = None
+    create: Optional[TaskCreate] = None
+    update: Optional[TaskUpdate] = None
+    # Expected task version for updates and deletes, like If-Match on PATCH
+    version: Optional[int] = None
+
+class BulkTaskRequest(BaseModel):
+    operations: List[BulkTaskItem] = Field(..., max_length=500)
+
+class MyTasksSort(str, Enum):
+    DUE_DATE = "due_date"
+    PRIORITY = "priority"
+    UPDATED_AT = "updated_at"
+    CREATED_AT = "created_at"
+
 class TokenResponse(BaseModel):
     access_token: str
     token_type: str = "bearer"
@@ -285,11 +920,11 @@ class InviteResponse(BaseModel):
     expires_at: datetime
 
 # Helper functions
-def verify_password(plain_password, hashed_password):
-    return pwd_context.verify(plain_password, hashed_password)
+async def verify_password(plain_password, hashed_password):
+    return await password_hasher.run(pwd_context.verify, plain_password, hashed_password)
 
-def get_password_hash(password):
-    return pwd_context.hash(password)
+async def get_password_hash(password):
+    return await password_hasher.run(pwd_context.hash, password)
 
 def create_access_token(data: dict):
     to_encode = data.copy()
@@ -303,33 +938,71 @@ async def get_current_user(authorization: str = Header(None)):
         raise HTTPException(status_code=401, detail="Not authenticated")
     
     token = authorization.replace("Bearer ", "")
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        user_id = payload.get("sub")
-        if user_id is None:
+    user_id = token_cache.get(token)
+    if user_id is None:
+        try:
+            payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+            user_id = payload.get("sub")
+            if user_id is None:
+                raise HTTPException(status_code=401, detail="Invalid token")
+        except JWTError:
             raise HTTPException(status_code=401, detail="Invalid token")
-    except JWTError:
-        raise HTTPException(status_code=401, detail="Invalid token")
+        # Never cache a token past its own expiry
+        if payload.get("exp"):
+            token_cache.set(token, user_id, ttl=payload["exp"] - time.time())
     
-    user = await db.users.find_one({"id": user_id}, {"_id": 0})
+    user = principal_cache.get(user_id)
     if user is None:
-        raise HTTPException(status_code=401, detail="User not found")
+        user = await db.users.find_one({"id": user_id}, {"_id": 0})
+        if user is None:
+            raise HTTPException(status_code=401, detail="User not found")
+        principal_cache.set(user_id, user)
     return user
 
+async def get_workspace_membership(workspace_id: str, fresh: bool = False) -> dict:
+    """Return the workspace and its user_id -> role map, served from cache when warm unless fresh"""
+    membership = None if fresh else membership_cache.get(workspace_id)
+    if membership is None:
+        workspace = await db.workspaces.find_one({"id": workspace_id}, {"_id": 0})
+        if not workspace:
+            raise HTTPException(status_code=404, detail="Workspace not found")
+        membership = {
+            "workspace": workspace,
+            "roles": {m["user_id"]: m["role"] for m in workspace.get("members", [])}
+        }
+        membership_cache.set(workspace_id, membership)
+    return membership
+
 async def verify_workspace_access(user: dict, workspace_id: str, required_role: Optional[Role] = None):
-    workspace = await db.workspaces.find_one({"id": workspace_id}, {"_id": 0})
-    if not workspace:
-        raise HTTPException(status_code=404, detail="Workspace not found")
+    # Admin actions can't wait out another worker's cache after a demotion or removal
+    membership = await get_workspace_membership(workspace_id, fresh=required_role == Role.ADMIN)
     
     # Check if user is member
-    member = next((m for m in workspace.get("members", []) if m["user_id"] == user["id"]), None)
-    if not member:
+    role = membership["roles"].get(user["id"])
+    if role is None:
         raise HTTPException(status_code=403, detail="Access denied")
     
-    if required_role == Role.ADMIN and member["role"] != "admin":
+    if required_role == Role.ADMIN and role != "admin":
         raise HTTPException(status_code=403, detail="Admin access required")
     
-    return workspace
+    return membership["workspace"]
+
+ASSIGNEE_NOT_MEMBER = "Assignee is not a member of this workspace"
+
+async def verify_assignee(workspace_id: str, assignee_id: Optional[str]):
+    """Tasks may only be assigned to members of their workspace"""
+    if not assignee_id:
+        return
+    membership = await get_workspace_membership(workspace_id)
+    if assignee_id not in membership["roles"]:
+        raise HTTPException(status_code=400, detail=ASSIGNEE_NOT_MEMBER)
+
+def invite_expiry(invite: dict) -> datetime:
+    """Invites store expires_at as a BSON date (for the TTL index); older ones as ISO strings"""
+    expires_at = invite["expires_at"]
+    if isinstance(expires_at, str):
+        return datetime.fromisoformat(expires_at)
+    return expires_at.replace(tzinfo=timezone.utc)
 
 def serialize_doc(doc):
     """Convert MongoDB document to JSON-serializable dict"""
@@ -351,8 +1024,889 @@ def serialize_doc(doc):
         return result
     return doc
 
+# JSON encoding
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def json_default(value):
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def dumps(content) -> bytes:
+    """Encode a payload in one pass; datetimes and ObjectIds need no pre-conversion"""
+    if orjson is not None:
+        return orjson.dumps(content, default=json_default)
+    return json.dumps(content, default=json_default, separators=(",", ":")).encode()
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content) -> bytes:
+        return dumps(content)
+
+def json_response(content, response: Optional[Response] = None, status_code: int = 200) -> FastJSONResponse:
+    """Return content encoded directly, skipping FastAPI's jsonable_encoder and response_model validation.
+    Headers already set on the injected response (e.g. ETag) are carried over."""
+    headers = dict(response.headers) if response is not None else None
+    return FastJSONResponse(content, status_code=status_code, headers=headers)
+
+# User hydration
+USER_PUBLIC_PROJECTION = {"_id": 0, "password": 0}
+USER_SUMMARY_PROJECTION = {"_id": 0, "password": 0, "workspaces": 0}
+USER_CARD_PROJECTION = {"_id": 0, "id": 1, "name": 1, "avatar": 1}
+
+async def load_users(user_ids, projection: Optional[dict] = None) -> Dict[str, dict]:
+    """Load the distinct users behind user_ids with a single $in query, keyed by id"""
+    ids = list({uid for uid in user_ids if uid})
+    if not ids:
+        return {}
+    users = await db.users.find(
+        {"id": {"$in": ids}},
+        projection or USER_PUBLIC_PROJECTION
+    ).to_list(len(ids))
+    return {u["id"]: u for u in users}
+
+def member_details(user_id: str, member_user: dict, role: Optional[str] = None) -> dict:
+    details = {
+        "user_id": user_id,
+        "name": member_user.get("name"),
+        "email": member_user.get("email"),
+        "avatar": member_user.get("avatar")
+    }
+    if role is not None:
+        details["role"] = role
+    return details
+
+async def load_workspace_members(workspace_id: str) -> dict:
+    """The workspace's member list read from Mongo, to go out under an ETag read just before it"""
+    # The membership cache is per process and may predate the revision in the ETag
+    return await db.workspaces.find_one({"id": workspace_id}, {"_id": 0, "id": 1, "members": 1}) or {"id": workspace_id}
+
+async def hydrate_workspace_members(workspaces: List[dict]) -> Dict[str, List[dict]]:
+    """Resolve member details for every workspace in one query, keyed by workspace id"""
+    users = await load_users(m["user_id"] for ws in workspaces for m in ws.get("members", []))
+    return {
+        ws["id"]: [
+            member_details(m["user_id"], users[m["user_id"]], m["role"])
+            for m in ws.get("members", []) if m["user_id"] in users
+        ]
+        for ws in workspaces
+    }
+
+async def hydrate_team_members(teams: List[dict]) -> Dict[str, List[dict]]:
+    """Resolve member details for every team in one query, keyed by team id"""
+    users = await load_users(mid for team in teams for mid in team.get("member_ids", []))
+    return {
+        team["id"]: [
+            member_details(mid, users[mid])
+            for mid in team.get("member_ids", []) if mid in users
+        ]
+        for team in teams
+    }
+
+async def attach_assignees(tasks: List[dict], projection: Optional[dict] = None) -> List[dict]:
+    """Populate task["assignee"] for every task using one users query"""
+    users = await load_users((t.get("assignee_id") for t in tasks), projection)
+    for task in tasks:
+        assignee = users.get(task.get("assignee_id"))
+        if assignee:
+            task["assignee"] = assignee
+    return tasks
+
+# Task projections
+TASK_FIELDS = {
+    "id", "title", "description", "status", "priority", "priority_rank", "project_id", "workspace_id",
+    "assignee_id", "due_date", "subtasks", "ai_generated", "ai_status", "version", "created_at", "updated_at"
+}
+SUBTASK_SUMMARY = {
+    "subtask_count": {"$size": {"$ifNull": ["$subtasks", []]}},
+    "subtasks_completed": {"$size": {"$filter": {
+        "input": {"$ifNull": ["$subtasks", []]},
+        "as": "subtask",
+        "cond": "$$subtask.completed"
+    }}}
+}
+# Everything a Kanban card renders; details load from GET /api/task/{task_id}
+CARD_PROJECTION = {
+    "_id": 0,
+    **{field: 1 for field in (
+        "id", "title", "status", "priority", "project_id", "workspace_id",
+        "assignee_id", "due_date", "ai_generated", "ai_status", "version", "updated_at"
+    )},
+    "description_preview": {"$substrCP": [{"$ifNull": ["$description", ""]}, 0, 140]},
+    **SUBTASK_SUMMARY
+}
+
+def task_projection(view: Optional[str], fields: Optional[str]) -> dict:
+    """Mongo projection for a task listing; id and updated_at are always kept for the cursor"""
+    if fields:
+        requested = {f.strip() for f in fields.split(",") if f.strip()}
+        unknown = requested - TASK_FIELDS - set(SUBTASK_SUMMARY)
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(sorted(unknown))}")
+        projection = {"_id": 0, "id": 1, "updated_at": 1}
+        for field in requested:
+            projection[field] = SUBTASK_SUMMARY.get(field, 1)
+        return projection
+    if view == "card":
+        return CARD_PROJECTION
+    return {"_id": 0}
+
+# Keyset pagination
+TASK_PAGE_SORT = [("updated_at", 1), ("id", 1)]
+STREAM_BATCH_SIZE = 500
+
+def encode_cursor(doc: dict) -> str:
+    raw = json.dumps([doc["updated_at"], doc["id"]]).encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+def decode_cursor(cursor: str) -> tuple:
+    try:
+        updated_at, doc_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return updated_at, doc_id
+
+def after_cursor(query: dict, cursor: Optional[str]) -> dict:
+    """Restrict query to documents sorted strictly after cursor on (updated_at, id)"""
+    if not cursor:
+        return query
+    updated_at, doc_id = decode_cursor(cursor)
+    return {"$and": [query, {"$or": [
+        {"updated_at": {"$gt": updated_at}},
+        {"updated_at": updated_at, "id": {"$gt": doc_id}}
+    ]}]}
+
+async def stream_tasks(cursor, fmt: str, assignee_projection: dict):
+    """Yield tasks straight from a Motor cursor as NDJSON or a chunked JSON array"""
+    async def batches():
+        batch = []
+        async for task in cursor:
+            batch.append(task)
+            if len(batch) >= STREAM_BATCH_SIZE:
+                yield await attach_assignees(batch, assignee_projection)
+                batch = []
+        if batch:
+            yield await attach_assignees(batch, assignee_projection)
+
+    if fmt == "ndjson":
+        async for batch in batches():
+            yield b"".join(dumps(t) + b"\n" for t in batch)
+        return
+
+    yield b'{"tasks": ['
+    first = True
+    async for batch in batches():
+        chunk = b",".join(dumps(t) for t in batch)
+        yield chunk if first else b"," + chunk
+        first = False
+    yield b"]}"
+
+# Workspace revisions
+async def bump_revision(workspace_id: str, *resources: str):
+    await db.workspace_revisions.update_one(
+        {"workspace_id": workspace_id},
+        {"$inc": {resource: 1 for resource in resources}, "$setOnInsert": {"epoch": str(ObjectId())}},
+        upsert=True
+    )
+
+async def get_revisions(workspace_id: str) -> dict:
+    revisions = await db.workspace_revisions.find_one({"workspace_id": workspace_id}, {"_id": 0})
+    if revisions is None:
+        await bump_revision(workspace_id)
+        revisions = await db.workspace_revisions.find_one({"workspace_id": workspace_id}, {"_id": 0})
+    return revisions
+
+async def check_etag(response: Response, if_none_match: Optional[str], workspace_id: str, resources: tuple, *variant) -> Optional[Response]:
+    """Set the ETag for a workspace resource; return a 304 if the client already has it"""
+    # Read the revision before the data so a concurrent write can only make the ETag older, never newer
+    revisions = await get_revisions(workspace_id)
+    key = "|".join(
+        [revisions["epoch"]] +
+        [f"{resource}:{revisions.get(resource, 0)}" for resource in resources] +
+        [str(v) for v in variant]
+    )
+    etag = f'W/"{hashlib.sha1(key.encode()).hexdigest()}"'
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "private, no-cache"
+    if if_none_match and etag in [t.strip() for t in if_none_match.split(",")]:
+        return Response(status_code=304, headers=dict(response.headers))
+    return None
+
+# Task change log
+CHANGE_GAP_GRACE_SECONDS = 5
+
+def change_entry(workspace_id: str, seq: int, before: Optional[dict], after: Optional[dict], now: datetime, op: Optional[str] = None) -> dict:
+    if after is None:
+        op, task = op or "deleted", None
+    else:
+        op = "created" if before is None else "updated"
+        task = serialize_doc({k: v for k, v in after.items() if k != "assignee"})
+    return {
+        "workspace_id": workspace_id,
+        "seq": seq,
+        "op": op,
+        "task_id": (after or before)["id"],
+        "task": task,
+        "created_at": now
+    }
+
+async def read_changes(workspace_id: str, since: int, limit: int) -> dict:
+    """Changes after since, or reset=True when they have already been compacted away"""
+    revisions = await db.workspace_revisions.find_one({"workspace_id": workspace_id}, {"_id": 0, "change_seq": 1})
+    current_seq = (revisions or {}).get("change_seq", 0)
+    if since >= current_seq:
+        return {"changes": [], "last_seq": current_seq, "has_more": False, "reset": since > current_seq}
+    
+    # Compaction removes the oldest entries first; if it reached past since, the client must refetch
+    oldest = await db.task_changes.find_one({"workspace_id": workspace_id}, {"_id": 0, "seq": 1}, sort=[("seq", ASCENDING)])
+    if oldest is None or oldest["seq"] > since + 1:
+        return {"changes": [], "last_seq": current_seq, "has_more": False, "reset": True}
+    
+    entries = await db.task_changes.find(
+        {"workspace_id": workspace_id, "seq": {"$gt": since}},
+        {"_id": 0, "workspace_id": 0}
+    ).sort("seq", ASCENDING).limit(limit).to_list(limit)
+    
+    # A sequence number is reserved before its entry is written; don't skip past a
+    # fresh gap or a concurrent writer's change would never be delivered
+    changes = []
+    expected = since + 1
+    grace = datetime.utcnow() - timedelta(seconds=CHANGE_GAP_GRACE_SECONDS)
+    for entry in entries:
+        if entry["seq"] != expected and entry["created_at"] > grace:
+            break
+        changes.append(entry)
+        expected = entry["seq"] + 1
+    
+    last_seq = changes[-1]["seq"] if changes else since
+    return {
+        "changes": changes,
+        "last_seq": last_seq,
+        "has_more": last_seq < current_seq,
+        "reset": False
+    }
+
+# Analytics rollups
+def stats_key(value: str) -> str:
+    """Escape a value for use as a workspace_stats field name, so '.' and '$' can't nest or fail the $inc"""
+    return value.replace("%", "%25").replace(".", "%2E").replace("$", "%24")
+
+def counter_values(counters: Any) -> Dict[str, int]:
+    """The positive integer counters of a rollup field, skipping anything malformed"""
+    if not isinstance(counters, dict):
+        return {}
+    return {
+        k: v for k, v in counters.items()
+        if isinstance(v, int) and not isinstance(v, bool) and v > 0
+    }
+
+def task_contribution(task: Optional[dict]) -> Dict[str, int]:
+    """Counters a single task adds to its workspace_stats document"""
+    if not task:
+        return {}
+    contribution = {
+        "total": 1,
+        f"status.{task['status']}": 1,
+        f"priority.{task['priority']}": 1
+    }
+    if task.get("assignee_id") and task["status"] != "done":
+        contribution[f"open_by_assignee.{stats_key(task['assignee_id'])}"] = 1
+    if task["status"] == "done" and task.get("updated_at"):
+        # The date prefix of the ISO string is the completion day in the writer's offset
+        contribution[f"completed_by_day.{task['updated_at'][:10]}"] = 1
+    return contribution
+
+async def apply_stats_changes(workspace_id: str, changes: List[tuple]):
+    """Move each task's contribution from before to after, folded into a single $inc"""
+    inc = {}
+    for before, after in changes:
+        for key, count in task_contribution(after).items():
+            inc[key] = inc.get(key, 0) + count
+        for key, count in task_contribution(before).items():
+            inc[key] = inc.get(key, 0) - count
+    inc = {key: count for key, count in inc.items() if count}
+    if inc:
+        # No upsert: workspaces without a rollup yet are rebuilt on first read
+        await db.workspace_stats.update_one({"workspace_id": workspace_id}, {"$inc": inc})
+
+async def record_task_changes(workspace_id: str, changes: List[tuple]) -> List[int]:
+    """Bookkeeping shared by every task write: rollups, the tasks revision and the change log"""
+    await apply_stats_changes(workspace_id, changes)
+    return await log_task_changes(workspace_id, changes)
+
+async def log_task_changes(workspace_id: str, changes: List[tuple], op: Optional[str] = None) -> List[int]:
+    """Bump the tasks revision and append changes to the log; op overrides the derived operation"""
+    # Bump the revision and reserve one sequence number per change in a single write
+    counters = await db.workspace_revisions.find_one_and_update(
+        {"workspace_id": workspace_id},
+        {"$inc": {"tasks": 1, "change_seq": len(changes)}, "$setOnInsert": {"epoch": str(ObjectId())}},
+        upsert=True,
+        return_document=ReturnDocument.AFTER
+    )
+    first_seq = counters["change_seq"] - len(changes) + 1
+    now = datetime.now(timezone.utc)
+    entries = [
+        change_entry(workspace_id, first_seq + n, before, after, now, op)
+        for n, (before, after) in enumerate(changes)
+    ]
+    await db.task_changes.insert_many(entries)
+    return [entry["seq"] for entry in entries]
+
+def counts_facet(field: str) -> list:
+    return [{"$group": {"_id": field, "count": {"$sum": 1}}}]
+
+def rollup_pipeline(workspace_id: str) -> list:
+    return [
+        {"$match": {"workspace_id": workspace_id}},
+        # Archived tasks still count towards the workspace's history
+        {"$unionWith": {"coll": "tasks_archive", "pipeline": [{"$match": {"workspace_id": workspace_id}}]}},
+        {"$facet": {
+            "status": counts_facet("$status"),
+            "priority": counts_facet("$priority"),
+            "open_by_assignee": [
+                {"$match": {"status": {"$ne": "done"}, "assignee_id": {"$nin": [None, ""]}}}
+            ] + counts_facet("$assignee_id"),
+            "completed_by_day": [
+                {"$match": {"status": "done", "updated_at": {"$type": "string"}}}
+            ] + counts_facet({"$substrBytes": ["$updated_at", 0, 10]})
+        }}
+    ]
+
+async def compute_workspace_stats(workspace_id: str) -> dict:
+    """Recompute a workspace_stats document from the raw tasks"""
+    result = await db.tasks.aggregate(rollup_pipeline(workspace_id)).to_list(1)
+    facets = result[0]
+    stats = {"workspace_id": workspace_id}
+    for field in ("status", "priority", "open_by_assignee", "completed_by_day"):
+        stats[field] = {stats_key(str(g["_id"])): g["count"] for g in facets[field]}
+    stats["total"] = sum(stats["status"].values())
+    return stats
+
+def stats_drift(stored: Optional[dict], expected: dict) -> Dict[str, dict]:
+    """Counters whose stored value differs from the recomputed one"""
+    stored = stored or {}
+    drift = {}
+    for field in ("status", "priority", "open_by_assignee", "completed_by_day"):
+        have, want = stored.get(field, {}), expected[field]
+        for key in set(have) | set(want):
+            if have.get(key, 0) != want.get(key, 0):
+                drift[f"{field}.{key}"] = {"stored": have.get(key, 0), "expected": want.get(key, 0)}
+    if stored.get("total", 0) != expected["total"]:
+        drift["total"] = {"stored": stored.get("total", 0), "expected": expected["total"]}
+    return drift
+
+async def rebuild_workspace_stats(workspace_id: str) -> dict:
+    stats = await compute_workspace_stats(workspace_id)
+    await db.workspace_stats.replace_one({"workspace_id": workspace_id}, stats, upsert=True)
+    return stats
+
+async def reconcile_workspace_stats(fix: bool = False) -> Dict[str, dict]:
+    """Compare every workspace's rollup with a fresh recomputation, optionally repairing it"""
+    report = {}
+    async for workspace in db.workspaces.find({}, {"_id": 0, "id": 1}):
+        workspace_id = workspace["id"]
+        expected = await compute_workspace_stats(workspace_id)
+        stored = await db.workspace_stats.find_one({"workspace_id": workspace_id}, {"_id": 0})
+        drift = stats_drift(stored, expected)
+        if drift:
+            report[workspace_id] = drift
+            if fix:
+                await db.workspace_stats.replace_one({"workspace_id": workspace_id}, expected, upsert=True)
+    return report
+
+# Task archival
+ARCHIVE_AFTER_DAYS = int(os.environ.get('ARCHIVE_AFTER_DAYS', 90))
+ARCHIVE_BATCH_SIZE = int(os.environ.get('ARCHIVE_BATCH_SIZE', 500))
+ARCHIVE_INTERVAL_SECONDS = int(os.environ.get('ARCHIVE_INTERVAL_SECONDS', 3600))
+# A worker that stops renewing its run for this long is presumed dead and its run taken over
+ARCHIVE_LEASE_SECONDS = int(os.environ.get('ARCHIVE_LEASE_SECONDS', 300))
+
+async def archive_batch(cutoff: str, cursor: Optional[str]) -> tuple:
+    """Move one batch of tasks done before cutoff; returns (archived, cursor) with cursor None when finished"""
+    query = after_cursor({"status": "done", "updated_at": {"$lt": cutoff}}, cursor)
+    tasks = await db.tasks.find(query, {"_id": 0}).sort(TASK_PAGE_SORT).to_list(ARCHIVE_BATCH_SIZE)
+    if not tasks:
+        return 0, None
+    next_cursor = encode_cursor(tasks[-1])
+    
+    # Copy before deleting so a crash leaves a duplicate rather than a lost task
+    archived_at = datetime.now(timezone.utc).isoformat()
+    await db.tasks_archive.bulk_write(
+        [ReplaceOne({"id": t["id"]}, {**t, "archived_at": archived_at}, upsert=True) for t in tasks],
+        ordered=False
+    )
+    # Only remove tasks nobody changed since they were read
+    result = await db.tasks.bulk_write(
+        [DeleteOne({"id": t["id"], "version": t.get("version")}) for t in tasks],
+        ordered=False
+    )
+    if result.deleted_count < len(tasks):
+        still_hot = await db.tasks.distinct("id", {"id": {"$in": [t["id"] for t in tasks]}})
+        await db.tasks_archive.delete_many({"id": {"$in": still_hot}})
+        tasks = [t for t in tasks if t["id"] not in set(still_hot)]
+    
+    # Rollups already count these tasks; only the revision and change log move
+    by_workspace = {}
+    for task in tasks:
+        by_workspace.setdefault(task["workspace_id"], []).append((task, None))
+    for workspace_id, changes in by_workspace.items():
+        await log_task_changes(workspace_id, changes, op="archived")
+    
+    return len(tasks), next_cursor
+
+async def claim_archive_run(owner: str) -> Optional[dict]:
+    """Take the archive_runs lease for owner; None while another worker holds it"""
+    now = datetime.now(timezone.utc)
+    try:
+        return await db.archive_runs.find_one_and_update(
+            {"_id": "tasks", "$or": [{"lease_until": None}, {"lease_until": {"$lt": now}}]},
+            {"$set": {"owner": owner, "lease_until": now + timedelta(seconds=ARCHIVE_LEASE_SECONDS)}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+    except DuplicateKeyError:
+        # The run exists and its lease is live, so the upsert collided with it
+        return None
+
+async def update_archive_run(owner: str, fields: dict) -> bool:
+    """Checkpoint the run and renew the lease; False if another worker has taken it over"""
+    result = await db.archive_runs.update_one(
+        {"_id": "tasks", "owner": owner},
+        {"$set": {**fields, "lease_until": datetime.now(timezone.utc) + timedelta(seconds=ARCHIVE_LEASE_SECONDS)}}
+    )
+    return result.matched_count == 1
+
+async def archive_done_tasks() -> Optional[int]:
+    """Archive tasks done for longer than ARCHIVE_AFTER_DAYS, resuming an interrupted run; None if another worker is archiving"""
+    owner = secrets.token_hex(8)
+    run = await claim_archive_run(owner)
+    if run is None:
+        return None
+    if run.get("cutoff") and not run.get("finished_at"):
+        cutoff, cursor, archived = run["cutoff"], run.get("cursor"), run.get("archived", 0)
+    else:
+        cutoff = (datetime.now(timezone.utc) - timedelta(days=ARCHIVE_AFTER_DAYS)).isoformat()
+        cursor, archived = None, 0
+        await update_archive_run(owner, {
+            "cutoff": cutoff, "cursor": None, "archived": 0, "started_at": datetime.now(timezone.utc), "finished_at": None
+        })
+    
+    while True:
+        count, cursor = await archive_batch(cutoff, cursor)
+        if cursor is None:
+            break
+        archived += count
+        # Checkpoint after every batch so a restart picks up where this one stopped
+        if not await update_archive_run(owner, {"cursor": cursor, "archived": archived}):
+            logging.error("Task archival lease lost to another worker; stopping this run")
+            return archived
+    
+    # Finishing releases the lease for the next interval's run
+    await db.archive_runs.update_one(
+        {"_id": "tasks", "owner": owner},
+        {"$set": {"finished_at": datetime.now(timezone.utc), "archived": archived, "lease_until": None}}
+    )
+    return archived
+
+async def run_archiver():
+    while True:
+        try:
+            archived = await archive_done_tasks()
+            if archived:
+                print(f"[INFO] Archived {archived} completed tasks")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logging.error(f"Task archival failed: {e}")
+        await asyncio.sleep(ARCHIVE_INTERVAL_SECONDS)
+
+# AI subtask jobs
+AI_WORKERS = int(os.environ.get('AI_WORKERS', 4))
+AI_QUEUE_SIZE = int(os.environ.get('AI_QUEUE_SIZE', 1000))
+AI_MAX_ATTEMPTS = int(os.environ.get('AI_MAX_ATTEMPTS', 3))
+AI_RETRY_BASE_SECONDS = float(os.environ.get('AI_RETRY_BASE_SECONDS', 1))
+AI_TIMEOUT_SECONDS = float(os.environ.get('AI_TIMEOUT_SECONDS', 60))
+AI_CACHE_TTL_SECONDS = float(os.environ.get('AI_CACHE_TTL_SECONDS', 86400))
+AI_CACHE_MAX_SIZE = int(os.environ.get('AI_CACHE_MAX_SIZE', 1000))
+
+def subtask_prompt(title: str, description: Optional[str]) -> str:
+    """The prompt the board used to send, so queued and interactive generations share cache entries"""
+    details = f"\nDescription: {description}" if description else ""
+    return (
+        f"Break down this task into 3-5 actionable subtasks:\n\nTask: {title}{details}\n\n"
+        'Return only a JSON array of subtasks in this format: [{"title": "subtask 1", "completed": false}]'
+    )
+
+def prompt_key(prompt: str) -> str:
+    """Cache key for a prompt; runs of whitespace and surrounding blanks don't matter"""
+    return hashlib.sha256(" ".join(prompt.split()).encode()).hexdigest()
+
+async def generate_subtask_list(prompt: str) -> List[dict]:
+    # Use a simple LLM-style generation (mock for now, replace with actual LLM)
+    task_match = re.search(r'Task: (.+?)(?:\n|$)', prompt)
+    task_title = task_match.group(1) if task_match else "task"
+    
+    # Generate subtasks based on common patterns
+    return [
+        {"title": f"Research and plan {task_title}", "completed": False},
+        {"title": f"Implement core functionality", "completed": False},
+        {"title": f"Test and validate results", "completed": False},
+        {"title": f"Document and review", "completed": False}
+    ]
+
+def ai_subtask_fields(subtasks: List[dict]) -> dict:
+    return {
+        "subtasks": subtasks,
+        "ai_generated": True,
+        "ai_status": "done",
+        "updated_at": datetime.now(timezone.utc).isoformat()
+    }
+
+async def publish_ai_changes(changes: List[tuple], event: str):
+    """Log AI writes and send one event per workspace, however many tasks it covers"""
+    by_workspace = {}
+    for before, after in changes:
+        by_workspace.setdefault(before["workspace_id"], []).append((before, after))
+    for workspace_id, workspace_changes in by_workspace.items():
+        seqs = await record_task_changes(workspace_id, workspace_changes)
+        await manager.broadcast_to_workspace(workspace_id, {
+            "type": event,
+            "first_seq": seqs[0],
+            "seq": seqs[-1],
+            "task_ids": [after["id"] for _, after in workspace_changes]
+        })
+
+async def apply_ai_update(query: dict, update_data: dict, event: str) -> Optional[dict]:
+    """Write an AI result onto the matching task, log it and notify the workspace; None if nothing matched"""
+    task = await db.tasks.find_one_and_update(
+        query,
+        {"$set": update_data, "$inc": {"version": 1}},
+        projection={"_id": 0},
+        return_document=ReturnDocument.BEFORE
+    )
+    if not task:
+        return None
+    updated_task = {**task, **update_data, "version": task.get("version", 0) + 1}
+    await publish_ai_changes([(task, updated_task)], event)
+    return updated_task
+
+async def apply_ai_subtasks(task_id: str, subtasks: List[dict], only_pending: bool = False) -> Optional[dict]:
+    """Store generated subtasks on a task for the job workers"""
+    query = {"id": task_id, "ai_status": "pending"} if only_pending else {"id": task_id}
+    return await apply_ai_update(query, ai_subtask_fields(subtasks), "task_ai_complete")
+
+async def apply_ai_subtasks_batch(results: Dict[str, List[dict]]) -> int:
+    """Store subtasks for many tasks with one read and one bulk_write; returns how many tasks were updated"""
+    tasks = await db.tasks.find({"id": {"$in": list(results)}}, {"_id": 0}).to_list(len(results))
+    if not tasks:
+        return 0
+    changes, ops = [], []
+    for task in tasks:
+        update_data = ai_subtask_fields(results[task["id"]])
+        # Guarded on the version read above, so the logged before/after is what the write really did
+        ops.append(UpdateOne({"id": task["id"], "version": task.get("version")}, {"$set": update_data, "$inc": {"version": 1}}))
+        changes.append((task, {**task, **update_data, "version": task.get("version", 0) + 1}))
+    result = await db.tasks.bulk_write(ops, ordered=False)
+    if result.matched_count < len(ops):
+        changes = await retry_ai_subtasks(changes, results)
+    await publish_ai_changes(changes, "task_ai_complete")
+    return len(changes)
+
+async def retry_ai_subtasks(changes: List[tuple], results: Dict[str, List[dict]]) -> List[tuple]:
+    """Redo one at a time the batch writes a concurrent writer got in ahead of; returns the changes made"""
+    ids = [before["id"] for before, _ in changes]
+    docs = await db.tasks.find({"id": {"$in": ids}}, {"_id": 0, "id": 1, "version": 1, "updated_at": 1}).to_list(len(ids))
+    current = {t["id"]: t for t in docs}
+    applied = []
+    for before, after in changes:
+        task = current.get(before["id"])
+        if task is None:
+            # Deleted since the batch read it
+            continue
+        if task.get("version") == after["version"] and task.get("updated_at") == after["updated_at"]:
+            applied.append((before, after))
+            continue
+        # Returns the document it replaced, so the change is built from what was really there
+        update_data = ai_subtask_fields(results[before["id"]])
+        task = await db.tasks.find_one_and_update(
+            {"id": before["id"]},
+            {"$set": update_data, "$inc": {"version": 1}},
+            projection={"_id": 0},
+            return_document=ReturnDocument.BEFORE
+        )
+        if task:
+            applied.append((task, {**task, **update_data, "version": task.get("version", 0) + 1}))
+    return applied
+
+class SubtaskJobs:
+    """Bounded pool of workers generating subtasks for tasks created with generate_ai"""
+    def __init__(self, workers: int, queue_size: int):
+        self.workers = workers
+        self.queue_size = queue_size
+        self.queue: Optional[asyncio.Queue] = None
+        self.tasks: List[asyncio.Task] = []
+        # Task ids waiting or running, so a requeue never doubles a job
+        self.queued = set()
+        # Prompt key -> generation in progress, awaited by every identical prompt
+        self.inflight: Dict[str, asyncio.Future] = {}
+        self.cache = TTLCache(AI_CACHE_MAX_SIZE, AI_CACHE_TTL_SECONDS)
+        self.overflowed = False
+        self.completed = 0
+        self.failed = 0
+        self.retries = 0
+        self.deduplicated = 0
+        self.generated = 0
+
+    async def start(self):
+        # Created here so the queue belongs to the server's event loop
+        self.queue = asyncio.Queue(maxsize=self.queue_size)
+        self.tasks = [asyncio.create_task(self.worker()) for _ in range(self.workers)]
+        await self.requeue_pending()
+
+    async def stop(self):
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        self.tasks = []
+
+    def enqueue(self, task: dict) -> bool:
+        """Queue generation for a task without waiting; a full queue leaves it pending for the next requeue"""
+        if self.queue is None or task["id"] in self.queued:
+            return False
+        try:
+            self.queue.put_nowait((task["id"], subtask_prompt(task["title"], task.get("description"))))
+        except asyncio.QueueFull:
+            self.overflowed = True
+            return False
+        self.queued.add(task["id"])
+        return True
+
+    async def requeue_pending(self):
+        """Queue tasks still marked pending, e.g. after a restart or queue overflow"""
+        pending = await db.tasks.find(
+            {"ai_status": "pending"},
+            {"_id": 0, "id": 1, "title": 1, "description": 1}
+        ).sort("created_at", ASCENDING).to_list(self.queue_size)
+        queued = sum(self.enqueue(task) for task in pending)
+        if queued:
+            print(f"[INFO] Requeued {queued} pending AI subtask jobs")
+
+    async def subtasks_for(self, prompt: str) -> List[dict]:
+        """Subtasks for a prompt from the cache, or shared with an identical generation already running"""
+        key = prompt_key(prompt)
+        cached = self.cache.get(key)
+        if cached is None:
+            future = self.inflight.get(key)
+            if future is None:
+                future = asyncio.ensure_future(self.generate(key, prompt))
+                self.inflight[key] = future
+                future.add_done_callback(lambda f: self.release(key, f))
+            else:
+                self.deduplicated += 1
+            # Shielded so one caller going away doesn't cancel the others' generation
+            cached = await asyncio.shield(future)
+        return [dict(subtask) for subtask in cached]
+
+    def release(self, key: str, future: asyncio.Future):
+        self.inflight.pop(key, None)
+        # Mark the error retrieved even if every waiter was cancelled
+        if not future.cancelled():
+            future.exception()
+
+    async def generate(self, key: str, prompt: str) -> List[dict]:
+        attempt = 1
+        while True:
+            try:
+                subtasks = await asyncio.wait_for(generate_subtask_list(prompt), AI_TIMEOUT_SECONDS)
+                break
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                if attempt >= AI_MAX_ATTEMPTS:
+                    raise
+                # Exponential backoff with jitter so retries from many workers spread out
+                delay = AI_RETRY_BASE_SECONDS * 2 ** (attempt - 1) * random.uniform(0.5, 1.5)
+                logging.warning(f"AI generation attempt {attempt} failed, retrying in {delay:.1f}s: {e!r}")
+                self.retries += 1
+                attempt += 1
+                await asyncio.sleep(delay)
+        self.generated += 1
+        self.cache.set(key, subtasks)
+        return subtasks
+
+    async def process(self, task_id: str, prompt: str):
+        try:
+            subtasks = await self.subtasks_for(prompt)
+        except Exception as e:
+            self.failed += 1
+            logging.error(f"AI subtask generation failed for task {task_id}: {e!r}")
+            await apply_ai_update({"id": task_id, "ai_status": "pending"}, {
+                "ai_status": "failed",
+                "updated_at": datetime.now(timezone.utc).isoformat()
+            }, "task_ai_failed")
+            return
+        # Only pending tasks: a webhook result or a deletion since queuing wins
+        await apply_ai_subtasks(task_id, subtasks, only_pending=True)
+        self.completed += 1
+
+    async def worker(self):
+        while True:
+            task_id, prompt = await self.queue.get()
+            try:
+                await self.process(task_id, prompt)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logging.error(f"AI subtask job for task {task_id} failed: {e!r}")
+            finally:
+                self.queued.discard(task_id)
+                self.queue.task_done()
+            if self.overflowed and self.queue.empty():
+                self.overflowed = False
+                try:
+                    await self.requeue_pending()
+                except Exception as e:
+                    logging.error(f"Requeueing AI subtask jobs failed: {e!r}")
+
+    def stats(self) -> dict:
+        return {
+            "queued": self.queue.qsize() if self.queue else 0,
+            "running": len(self.queued) - (self.queue.qsize() if self.queue else 0),
+            "inflight_prompts": len(self.inflight),
+            "completed": self.completed,
+            "failed": self.failed,
+            "retries": self.retries,
+            "deduplicated": self.deduplicated,
+            "generated": self.generated,
+            "cache": self.cache.stats()
+        }
+
+ai_jobs = SubtaskJobs(AI_WORKERS, AI_QUEUE_SIZE)
+
+# Webhook intake
+WEBHOOK_BATCH_SIZE = int(os.environ.get('WEBHOOK_BATCH_SIZE', 500))
+# How long a woken applier waits for a burst to build up before claiming a batch
+WEBHOOK_LINGER_MS = float(os.environ.get('WEBHOOK_LINGER_MS', 20))
+# Picks up events queued by other workers or left behind by a crash
+WEBHOOK_POLL_SECONDS = float(os.environ.get('WEBHOOK_POLL_SECONDS', 5))
+WEBHOOK_CLAIM_TIMEOUT_SECONDS = int(os.environ.get('WEBHOOK_CLAIM_TIMEOUT_SECONDS', 60))
+WEBHOOK_MAX_ATTEMPTS = int(os.environ.get('WEBHOOK_MAX_ATTEMPTS', 5))
+
+def webhook_key(webhook: WebhookEvent, idempotency_key: Optional[str]) -> str:
+    """Dedup key for a delivery: the sender's Idempotency-Key, else a hash of the event itself"""
+    if idempotency_key:
+        return f"key:{idempotency_key}"
+    body = json.dumps({"event": webhook.event, "data": webhook.data}, sort_keys=True, default=str)
+    return "sha256:" + hashlib.sha256(body.encode()).hexdigest()
+
+class WebhookApplier:
+    """Applies queued webhook events from webhook_events in micro-batches"""
+    def __init__(self):
+        self.wakeup: Optional[asyncio.Event] = None
+        self.task: Optional[asyncio.Task] = None
+
+    def start(self):
+        self.wakeup = asyncio.Event()
+        self.task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        if self.task:
+            self.task.cancel()
+            await asyncio.gather(self.task, return_exceptions=True)
+
+    def notify(self):
+        if self.wakeup:
+            self.wakeup.set()
+
+    async def claim(self) -> List[dict]:
+        """Claim the oldest queued events, plus any whose claimant died without finishing them"""
+        now = datetime.now(timezone.utc)
+        claimable = {"$or": [
+            {"status": "queued"},
+            {
+                "status": "applying",
+                "claimed_at": {"$lt": now - timedelta(seconds=WEBHOOK_CLAIM_TIMEOUT_SECONDS)},
+                "attempts": {"$lt": WEBHOOK_MAX_ATTEMPTS}
+            }
+        ]}
+        candidates = await db.webhook_events.find(claimable, {"_id": 1}).sort("received_at", ASCENDING).to_list(WEBHOOK_BATCH_SIZE)
+        if not candidates:
+            return []
+        # Re-checked in the update so two workers never claim the same event
+        claim = secrets.token_hex(8)
+        await db.webhook_events.update_many(
+            {"_id": {"$in": [e["_id"] for e in candidates]}, **claimable},
+            {"$set": {"status": "applying", "claim": claim, "claimed_at": now}, "$inc": {"attempts": 1}}
+        )
+        return await db.webhook_events.find({"claim": claim}).sort("received_at", ASCENDING).to_list(WEBHOOK_BATCH_SIZE)
+
+    async def apply(self, events: List[dict]):
+        # Events arrive oldest first, so the latest result for a task wins
+        results = {}
+        for event in events:
+            if event["event"] == "ai.task_complete" and event["data"].get("task_id"):
+                results[event["data"]["task_id"]] = event["data"].get("subtasks", [])
+        if results:
+            await apply_ai_subtasks_batch(results)
+        
+        applied_at = datetime.now(timezone.utc)
+        await db.webhook_events.update_many(
+            {"_id": {"$in": [e["_id"] for e in events]}},
+            {"$set": {"status": "applied", "applied_at": applied_at}, "$unset": {"claim": ""}}
+        )
+        webhook_events.inc("applied", amount=len(events))
+        webhook_batch_size.observe(len(events))
+        for event in events:
+            received_at = event["received_at"].replace(tzinfo=timezone.utc)
+            webhook_apply_lag_seconds.observe((applied_at - received_at).total_seconds())
+
+    async def drain(self) -> int:
+        """Apply one batch; returns how many events it claimed"""
+        events = await self.claim()
+        if not events:
+            return 0
+        try:
+            await self.apply(events)
+        except Exception as e:
+            # Isolate the event that broke the batch; the rest still go through
+            logging.error(f"Webhook batch of {len(events)} failed, applying one at a time: {e!r}")
+            for event in events:
+                try:
+                    await self.apply([event])
+                except Exception as e:
+                    webhook_events.inc("failed")
+                    logging.error(f"Webhook event {event['_id']} failed on attempt {event.get('attempts')}: {e!r}")
+        return len(events)
+
+    async def run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self.wakeup.wait(), WEBHOOK_POLL_SECONDS)
+                await asyncio.sleep(WEBHOOK_LINGER_MS / 1000)
+            except asyncio.TimeoutError:
+                pass
+            # Cleared before draining so events arriving mid-batch wake the next round
+            self.wakeup.clear()
+            try:
+                while await self.drain() == WEBHOOK_BATCH_SIZE:
+                    pass
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logging.error(f"Applying webhook events failed: {e!r}")
+
+webhook_applier = WebhookApplier()
+
 # Create the main app
-app = FastAPI(title="DevPulse SaaS API", lifespan=lifespan)
+app = FastAPI(title="DevPulse SaaS API", lifespan=lifespan, default_response_class=FastJSONResponse)
 api_router = APIRouter(prefix="/api")
 
 # Root endpoint
@@ -375,7 +1929,7 @@ async def register(user_data: UserCreate):
         "id": user_id,
         "name": user_data.name,
         "email": user_data.email,
-        "password": get_password_hash(user_data.password),
+        "password": await get_password_hash(user_data.password),
         "avatar": f"https://api.dicebear.com/7.x/avataaars/svg?seed={user_data.name}",
         "workspaces": [],
         "must_change_password": False,
@@ -420,7 +1974,7 @@ async def register(user_data: UserCreate):
 @api_router.post("/auth/login", response_model=TokenResponse)
 async def login(user_data: UserLogin):
     user = await db.users.find_one({"email": user_data.email}, {"_id": 0})
-    if not user or not verify_password(user_data.password, user["password"]):
+    if not user or not await verify_password(user_data.password, user["password"]):
         raise HTTPException(status_code=401, detail="Invalid credentials")
     
     access_token = create_access_token(data={"sub": user["id"]})
@@ -451,30 +2005,20 @@ async def get_workspaces(user: dict = Depends(get_current_user)):
         {"_id": 0}
     ).to_list(100)
     
+    # Fetch member details
+    members_by_workspace = await hydrate_workspace_members(workspaces)
+    
     result = []
     for ws in workspaces:
-        # Fetch member details
-        members = []
-        for member in ws.get("members", []):
-            member_user = await db.users.find_one({"id": member["user_id"]}, {"_id": 0, "password": 0})
-            if member_user:
-                members.append({
-                    "user_id": member["user_id"],
-                    "name": member_user.get("name"),
-                    "email": member_user.get("email"),
-                    "avatar": member_user.get("avatar"),
-                    "role": member["role"]
-                })
-        
-        result.append(WorkspaceResponse(
-            id=ws["id"],
-            name=ws["name"],
-            owner_id=ws["owner_id"],
-            members=members,
-            created_at=datetime.fromisoformat(ws["created_at"])
-        ))
+        result.append({
+            "id": ws["id"],
+            "name": ws["name"],
+            "owner_id": ws["owner_id"],
+            "members": members_by_workspace[ws["id"]],
+            "created_at": ws["created_at"]
+        })
     
-    return result
+    return json_response(result)
 
 @api_router.post("/workspaces", response_model=WorkspaceResponse)
 async def create_workspace(workspace_data: WorkspaceCreate, user: dict = Depends(get_current_user)):
@@ -493,6 +2037,7 @@ async def create_workspace(workspace_data: WorkspaceCreate, user: dict = Depends
         {"id": user["id"]},
         {"$push": {"workspaces": workspace_id}}
     )
+    invalidate_user(user["id"])
     
     return WorkspaceResponse(
         id=workspace_id,
@@ -504,22 +2049,17 @@ async def create_workspace(workspace_data: WorkspaceCreate, user: dict = Depends
 
 # Get workspace members (for admin)
 @api_router.get("/workspaces/{workspace_id}/members")
-async def get_workspace_members(workspace_id: str, user: dict = Depends(get_current_user)):
-    workspace = await verify_workspace_access(user, workspace_id)
-    
-    members = []
-    for member in workspace.get("members", []):
-        member_user = await db.users.find_one({"id": member["user_id"]}, {"_id": 0, "password": 0})
-        if member_user:
-            members.append({
-                "user_id": member["user_id"],
-                "name": member_user.get("name"),
-                "email": member_user.get("email"),
-                "avatar": member_user.get("avatar"),
-                "role": member["role"]
-            })
+async def get_workspace_members(workspace_id: str, response: Response, if_none_match: Optional[str] = Header(None), user: dict = Depends(get_current_user)):
+    await verify_workspace_access(user, workspace_id)
+    
+    not_modified = await check_etag(response, if_none_match, workspace_id, ("members",))
+    if not_modified:
+        return not_modified
+    
+    workspace = await load_workspace_members(workspace_id)
+    members_by_workspace = await hydrate_workspace_members([workspace])
     
-    return {"members": members}
+    return json_response({"members": members_by_workspace[workspace["id"]]}, response)
 
 # Invite member to workspace (admin only)
 @api_router.post("/workspaces/{workspace_id}/invite")
@@ -547,6 +2087,9 @@ async def invite_member(workspace_id: str, email: str, user: dict = Depends(get_
         {"id": invited_user["id"]},
         {"$push": {"workspaces": workspace_id}}
     )
+    invalidate_workspace(workspace_id)
+    invalidate_user(invited_user["id"])
+    await bump_revision(workspace_id, "members")
     
     return {"message": "Member invited successfully", "user": {
         "id": invited_user["id"],
@@ -570,7 +2113,7 @@ async def create_member(workspace_id: str, member_data: MemberCreate, user: dict
         "id": member_id,
         "name": member_data.name,
         "email": member_data.email,
-        "password": get_password_hash(member_data.password),
+        "password": await get_password_hash(member_data.password),
         "avatar": f"https://api.dicebear.com/7.x/avataaars/svg?seed={member_data.name}",
         "workspaces": [workspace_id],
         "must_change_password": True,
@@ -583,6 +2126,8 @@ async def create_member(workspace_id: str, member_data: MemberCreate, user: dict
         {"id": workspace_id},
         {"$push": {"members": {"user_id": member_id, "role": "member"}}}
     )
+    invalidate_workspace(workspace_id)
+    await bump_revision(workspace_id, "members")
     
     return {"message": "Member created successfully", "user": {
         "id": member_id,
@@ -593,18 +2138,20 @@ async def create_member(workspace_id: str, member_data: MemberCreate, user: dict
 # Change password
 @api_router.post("/auth/change-password")
 async def change_password(password_data: PasswordChange, user: dict = Depends(get_current_user)):
-    # Verify old password
-    if not verify_password(password_data.old_password, user["password"]):
+    # Verify old password against the stored hash; the cached principal may predate a change made on another worker
+    stored = await db.users.find_one({"id": user["id"]}, {"_id": 0, "password": 1})
+    if not stored or not await verify_password(password_data.old_password, stored["password"]):
         raise HTTPException(status_code=400, detail="Incorrect current password")
     
     # Update password
     await db.users.update_one(
         {"id": user["id"]},
         {"$set": {
-            "password": get_password_hash(password_data.new_password),
+            "password": await get_password_hash(password_data.new_password),
             "must_change_password": False
         }}
     )
+    invalidate_user(user["id"])
     
     return {"message": "Password changed successfully"}
 
@@ -624,7 +2171,7 @@ async def create_workspace_invite(workspace_id: str, invite_data: InviteCreate,
         "token": token,
         "email": invite_data.email,
         "created_at": now.isoformat(),
-        "expires_at": expires_at.isoformat(),
+        "expires_at": expires_at,
         "created_by": user["id"]
     }
     
@@ -646,7 +2193,7 @@ async def get_invite_details(token: str):
     if not invite:
         raise HTTPException(status_code=404, detail="Invite not found")
     
-    expires_at = datetime.fromisoformat(invite["expires_at"])
+    expires_at = invite_expiry(invite)
     if expires_at < datetime.now(timezone.utc):
         raise HTTPException(status_code=400, detail="Invite expired")
     
@@ -657,7 +2204,7 @@ async def get_invite_details(token: str):
     return {
         "workspace_name": workspace["name"],
         "email": invite.get("email"),
-        "expires_at": invite["expires_at"]
+        "expires_at": expires_at.isoformat()
     }
 
 # Accept invite
@@ -667,7 +2214,7 @@ async def accept_invite(token: str, user: dict = Depends(get_current_user)):
     if not invite:
         raise HTTPException(status_code=404, detail="Invite not found")
     
-    expires_at = datetime.fromisoformat(invite["expires_at"])
+    expires_at = invite_expiry(invite)
     if expires_at < datetime.now(timezone.utc):
         raise HTTPException(status_code=400, detail="Invite expired")
     
@@ -689,21 +2236,28 @@ async def accept_invite(token: str, user: dict = Depends(get_current_user)):
         {"id": user["id"]},
         {"$push": {"workspaces": workspace_id}}
     )
+    invalidate_workspace(workspace_id)
+    invalidate_user(user["id"])
+    await bump_revision(workspace_id, "members")
     
     return {"message": "Successfully joined workspace", "workspace_id": workspace_id}
 
 # Project routes
 @api_router.get("/projects/{workspace_id}", response_model=List[ProjectResponse])
-async def get_projects(workspace_id: str, team_id: Optional[str] = None, user: dict = Depends(get_current_user)):
+async def get_projects(workspace_id: str, response: Response, team_id: Optional[str] = None, if_none_match: Optional[str] = Header(None), user: dict = Depends(get_current_user)):
     await verify_workspace_access(user, workspace_id)
     
+    not_modified = await check_etag(response, if_none_match, workspace_id, ("projects",), team_id)
+    if not_modified:
+        return not_modified
+    
     query = {"workspace_id": workspace_id}
     if team_id:
         query["team_id"] = team_id
     
     projects = await db.projects.find(query, {"_id": 0}).to_list(100)
     
-    return [ProjectResponse(**serialize_doc(p)) for p in projects]
+    return json_response(projects, response)
 
 @api_router.post("/projects", response_model=ProjectResponse)
 async def create_project(project_data: ProjectCreate, user: dict = Depends(get_current_user)):
@@ -719,39 +2273,35 @@ async def create_project(project_data: ProjectCreate, user: dict = Depends(get_c
         "created_at": datetime.now(timezone.utc).isoformat()
     }
     await db.projects.insert_one(project_doc)
+    await bump_revision(project_data.workspace_id, "projects")
     
     return ProjectResponse(**serialize_doc(project_doc))
 
 # Team routes
 @api_router.get("/teams/{workspace_id}", response_model=List[TeamResponse])
-async def get_teams(workspace_id: str, user: dict = Depends(get_current_user)):
+async def get_teams(workspace_id: str, response: Response, if_none_match: Optional[str] = Header(None), user: dict = Depends(get_current_user)):
     await verify_workspace_access(user, workspace_id)
     
+    not_modified = await check_etag(response, if_none_match, workspace_id, ("teams", "members"))
+    if not_modified:
+        return not_modified
+    
     teams = await db.teams.find({"workspace_id": workspace_id}, {"_id": 0}).to_list(100)
     
+    members_by_team = await hydrate_team_members(teams)
+    
     result = []
     for team in teams:
-        members = []
-        for member_id in team.get("member_ids", []):
-            member_user = await db.users.find_one({"id": member_id}, {"_id": 0, "password": 0})
-            if member_user:
-                members.append({
-                    "user_id": member_id,
-                    "name": member_user.get("name"),
-                    "email": member_user.get("email"),
-                    "avatar": member_user.get("avatar")
-                })
-        
-        result.append(TeamResponse(
-            id=team["id"],
-            name=team["name"],
-            description=team.get("description"),
-            workspace_id=team["workspace_id"],
-            members=members,
-            created_at=datetime.fromisoformat(team["created_at"])
-        ))
+        result.append({
+            "id": team["id"],
+            "name": team["name"],
+            "description": team.get("description"),
+            "workspace_id": team["workspace_id"],
+            "members": members_by_team[team["id"]],
+            "created_at": team["created_at"]
+        })
     
-    return result
+    return json_response(result, response)
 
 @api_router.post("/teams", response_model=TeamResponse)
 async def create_team(team_data: TeamCreate, user: dict = Depends(get_current_user)):
@@ -767,24 +2317,16 @@ async def create_team(team_data: TeamCreate, user: dict = Depends(get_current_us
         "created_at": datetime.now(timezone.utc).isoformat()
     }
     await db.teams.insert_one(team_doc)
+    await bump_revision(team_data.workspace_id, "teams")
     
-    members = []
-    for member_id in team_data.member_ids:
-        member_user = await db.users.find_one({"id": member_id}, {"_id": 0, "password": 0})
-        if member_user:
-            members.append({
-                "user_id": member_id,
-                "name": member_user.get("name"),
-                "email": member_user.get("email"),
-                "avatar": member_user.get("avatar")
-            })
+    members_by_team = await hydrate_team_members([team_doc])
     
     return TeamResponse(
         id=team_id,
         name=team_data.name,
         description=team_data.description,
         workspace_id=team_data.workspace_id,
-        members=members,
+        members=members_by_team[team_id],
         created_at=datetime.now(timezone.utc)
     )
 
@@ -804,92 +2346,233 @@ async def update_team(team_id: str, team_data: TeamCreate, user: dict = Depends(
             "member_ids": team_data.member_ids
         }}
     )
+    await bump_revision(team["workspace_id"], "teams")
     
     updated_team = await db.teams.find_one({"id": team_id}, {"_id": 0})
     
-    members = []
-    for member_id in updated_team.get("member_ids", []):
-        member_user = await db.users.find_one({"id": member_id}, {"_id": 0, "password": 0})
-        if member_user:
-            members.append({
-                "user_id": member_id,
-                "name": member_user.get("name"),
-                "email": member_user.get("email"),
-                "avatar": member_user.get("avatar")
-            })
+    members_by_team = await hydrate_team_members([updated_team])
     
-    return TeamResponse(**serialize_doc(updated_team), members=members)
+    return TeamResponse(**serialize_doc(updated_team), members=members_by_team[team_id])
 
 # Task routes
 @api_router.get("/tasks/{workspace_id}")
-async def get_tasks(workspace_id: str, project_id: Optional[str] = None, user: dict = Depends(get_current_user)):
+async def get_tasks(
+    workspace_id: str,
+    response: Response,
+    project_id: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    stream: Optional[str] = Query(None, pattern="^(ndjson|json)$"),
+    view: Optional[str] = Query(None, pattern="^(card|full)$"),
+    fields: Optional[str] = None,
+    if_none_match: Optional[str] = Header(None),
+    user: dict = Depends(get_current_user)
+):
     await verify_workspace_access(user, workspace_id)
     
+    not_modified = await check_etag(response, if_none_match, workspace_id, ("tasks", "members"), project_id, limit, cursor, stream, view, fields)
+    if not_modified:
+        return not_modified
+    
     query = {"workspace_id": workspace_id}
     if project_id:
         query["project_id"] = project_id
+    query = after_cursor(query, cursor)
+    
+    # Slim views are projected in Mongo so long fields never leave the server
+    projection = task_projection(view, fields)
+    assignee_projection = USER_SUMMARY_PROJECTION if projection == {"_id": 0} else USER_CARD_PROJECTION
+    tasks_cursor = db.tasks.find(query, projection).sort(TASK_PAGE_SORT)
+    
+    # Opt-in streaming keeps memory flat regardless of board size
+    if stream:
+        if limit:
+            tasks_cursor = tasks_cursor.limit(limit)
+        media_type = "application/x-ndjson" if stream == "ndjson" else "application/json"
+        return StreamingResponse(
+            stream_tasks(tasks_cursor.batch_size(STREAM_BATCH_SIZE), stream, assignee_projection),
+            media_type=media_type,
+            # Carry the ETag check_etag set, so streamed listings can be revalidated too
+            headers=dict(response.headers)
+        )
     
-    tasks = await db.tasks.find(query, {"_id": 0}).to_list(1000)
+    if limit:
+        # Fetch one extra row to know whether another page exists
+        tasks = await tasks_cursor.limit(limit + 1).to_list(limit + 1)
+        next_cursor = encode_cursor(tasks[limit - 1]) if len(tasks) > limit else None
+        tasks = tasks[:limit]
+    else:
+        tasks = await tasks_cursor.to_list(None)
+        next_cursor = None
     
     # Populate assignee details
-    for task in tasks:
-        if task.get("assignee_id"):
-            assignee = await db.users.find_one(
-                {"id": task["assignee_id"]},
-                {"_id": 0, "password": 0, "workspaces": 0}
-            )
-            if assignee:
-                task["assignee"] = serialize_doc(assignee)
+    if projection == {"_id": 0} or "assignee_id" in projection:
+        await attach_assignees(tasks, assignee_projection)
+    
+    return json_response({"tasks": tasks, "next_cursor": next_cursor}, response)
+
+@api_router.get("/tasks/{workspace_id}/archive")
+async def get_archived_tasks(
+    workspace_id: str,
+    response: Response,
+    project_id: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    if_none_match: Optional[str] = Header(None),
+    user: dict = Depends(get_current_user)
+):
+    """Tasks the archiver moved out of the hot set, oldest first"""
+    await verify_workspace_access(user, workspace_id)
     
-    return {"tasks": serialize_doc(tasks)}
+    not_modified = await check_etag(response, if_none_match, workspace_id, ("tasks", "members"), "archive", project_id, limit, cursor)
+    if not_modified:
+        return not_modified
+    
+    query = {"workspace_id": workspace_id}
+    if project_id:
+        query["project_id"] = project_id
+    query = after_cursor(query, cursor)
+    
+    tasks = await db.tasks_archive.find(query, {"_id": 0}).sort(TASK_PAGE_SORT).to_list(limit + 1)
+    next_cursor = encode_cursor(tasks[limit - 1]) if len(tasks) > limit else None
+    tasks = tasks[:limit]
+    
+    await attach_assignees(tasks, USER_SUMMARY_PROJECTION)
+    
+    return json_response({"tasks": tasks, "next_cursor": next_cursor}, response)
 
-@api_router.post("/tasks")
-async def create_task(task_data: TaskCreate, background_tasks: BackgroundTasks, user: dict = Depends(get_current_user)):
-    await verify_workspace_access(user, task_data.workspace_id)
+@api_router.get("/task/{task_id}")
+async def get_task(task_id: str, response: Response, archived: bool = False, user: dict = Depends(get_current_user)):
+    collection = db.tasks_archive if archived else db.tasks
+    task = await collection.find_one({"id": task_id}, {"_id": 0})
+    if not task:
+        raise HTTPException(status_code=404, detail="Task not found")
+    
+    await verify_workspace_access(user, task["workspace_id"])
     
-    task_id = str(ObjectId())
-    task_doc = {
-        "id": task_id,
+    # Populate assignee details
+    await attach_assignees([task], USER_SUMMARY_PROJECTION)
+    
+    response.headers["ETag"] = f'"{task.get("version", 0)}"'
+    return json_response({"task": task}, response)
+
+# Kanban board
+BOARD_SORT = {"priority_rank": 1, "due_date": 1, "id": 1}
+BOARD_PROJECTION = {**CARD_PROJECTION, "priority_rank": 1}
+
+def encode_board_cursor(doc: dict) -> str:
+    raw = json.dumps([doc.get("priority_rank"), doc.get("due_date"), doc["id"]]).encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+def after_board_cursor(query: dict, cursor: str) -> dict:
+    """Restrict query to cards sorted strictly after cursor on (priority_rank, due_date, id)"""
+    try:
+        rank, due_date, doc_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    
+    # Missing due dates sort first, and range operators never match across null and string
+    if due_date is None:
+        same_rank = {"$or": [
+            {"due_date": None, "id": {"$gt": doc_id}},
+            {"due_date": {"$type": "string"}}
+        ]}
+    else:
+        same_rank = {"$or": [
+            {"due_date": {"$gt": due_date}},
+            {"due_date": due_date, "id": {"$gt": doc_id}}
+        ]}
+    return {"$and": [query, {"$or": [
+        {"priority_rank": {"$gt": rank}},
+        {"$and": [{"priority_rank": rank}, same_rank]}
+    ]}]}
+
+def board_column_pipeline(query: dict, limit: int) -> List[dict]:
+    return [
+        {"$match": query},
+        {"$sort": BOARD_SORT},
+        # One extra card tells us whether the column continues
+        {"$limit": limit + 1},
+        {"$project": BOARD_PROJECTION}
+    ]
+
+@api_router.get("/board/{workspace_id}")
+async def get_board(
+    workspace_id: str,
+    response: Response,
+    project_id: str,
+    limit: int = Query(20, ge=1, le=200),
+    status: Optional[TaskStatus] = None,
+    cursor: Optional[str] = None,
+    if_none_match: Optional[str] = Header(None),
+    user: dict = Depends(get_current_user)
+):
+    """First cards of every column, or the next page of one column when status and cursor are given"""
+    await verify_workspace_access(user, workspace_id)
+    if cursor and not status:
+        raise HTTPException(status_code=400, detail="A cursor continues a single column; pass its status")
+    
+    not_modified = await check_etag(
+        response, if_none_match, workspace_id, ("tasks", "members"),
+        project_id, limit, status.value if status else None, cursor
+    )
+    if not_modified:
+        return not_modified
+    
+    statuses = [status] if status else list(TaskStatus)
+    queries = []
+    for column in statuses:
+        query = {"workspace_id": workspace_id, "project_id": project_id, "status": column.value}
+        queries.append(after_board_cursor(query, cursor) if cursor else query)
+    
+    # Each column is an index-backed top-N branch, so the board costs the same however deep the backlog
+    pipeline = board_column_pipeline(queries[0], limit)
+    for query in queries[1:]:
+        pipeline.append({"$unionWith": {"coll": "tasks", "pipeline": board_column_pipeline(query, limit)}})
+    cards = await db.tasks.aggregate(pipeline).to_list(None)
+    
+    columns = {column.value: {"tasks": [], "next_cursor": None} for column in statuses}
+    for card in cards:
+        column = columns[card["status"]]
+        if len(column["tasks"]) < limit:
+            column["tasks"].append(card)
+        else:
+            column["next_cursor"] = encode_board_cursor(column["tasks"][-1])
+    
+    await attach_assignees(cards, USER_CARD_PROJECTION)
+    
+    return json_response({"columns": columns}, response)
+
+def build_task_doc(task_data: TaskCreate) -> dict:
+    return {
+        "id": str(ObjectId()),
         "title": task_data.title,
         "description": task_data.description,
         "status": task_data.status.value,
         "priority": task_data.priority.value,
+        "priority_rank": PRIORITY_RANK.index(task_data.priority.value),
         "project_id": task_data.project_id,
         "workspace_id": task_data.workspace_id,
         "assignee_id": task_data.assignee_id,
         "due_date": task_data.due_date.isoformat() if task_data.due_date else None,
         "subtasks": [s.dict() for s in task_data.subtasks],
         "ai_generated": False,
+        # Picked up by the AI subtask workers; "done" or "failed" once they finish
+        "ai_status": "pending" if task_data.generate_ai else None,
+        "version": 1,
         "created_at": datetime.now(timezone.utc).isoformat(),
         "updated_at": datetime.now(timezone.utc).isoformat()
     }
-    await db.tasks.insert_one(task_doc)
-    
-    # Populate assignee
-    if task_doc.get("assignee_id"):
-        assignee = await db.users.find_one(
-            {"id": task_doc["assignee_id"]},
-            {"_id": 0, "password": 0}
-        )
-        if assignee:
-            task_doc["assignee"] = serialize_doc(assignee)
-    
-    # Broadcast to workspace
-    await manager.broadcast_to_workspace(task_data.workspace_id, {
-        "type": "task_created",
-        "task": serialize_doc(task_doc)
-    })
-    
-    return {"task": serialize_doc(task_doc)}
 
-@api_router.patch("/tasks/{task_id}")
-async def update_task(task_id: str, task_update: TaskUpdate, user: dict = Depends(get_current_user)):
-    task = await db.tasks.find_one({"id": task_id}, {"_id": 0})
-    if not task:
-        raise HTTPException(status_code=404, detail="Task not found")
-
-    await verify_workspace_access(user, task["workspace_id"])
+def task_diff(before: dict, after: dict) -> dict:
+    """Fields whose value changed between two versions of a task"""
+    return {
+        k: v for k, v in after.items()
+        if k not in ("_id", "assignee", "version") and before.get(k) != v
+    }
 
+def task_update_fields(task_update: TaskUpdate) -> dict:
+    """The $set document for a TaskUpdate, with enums and dates stored as strings"""
     update_data = {k: v for k, v in task_update.dict(exclude_unset=True).items() if v is not None}
 
     # Convert enums to strings
@@ -897,36 +2580,267 @@ async def update_task(task_id: str, task_update: TaskUpdate, user: dict = Depend
         update_data["status"] = update_data["status"].value
     if "priority" in update_data:
         update_data["priority"] = update_data["priority"].value
+        update_data["priority_rank"] = PRIORITY_RANK.index(update_data["priority"])
     if "due_date" in update_data and update_data["due_date"]:
         update_data["due_date"] = update_data["due_date"].isoformat()
     if "subtasks" in update_data:
         update_data["subtasks"] = [s.dict() for s in update_data["subtasks"]]
 
     update_data["updated_at"] = datetime.now(timezone.utc).isoformat()
+    return update_data
 
-    await db.tasks.update_one(
-        {"id": task_id},
-        {"$set": update_data}
-    )
+@api_router.post("/tasks")
+async def create_task(task_data: TaskCreate, background_tasks: BackgroundTasks, user: dict = Depends(get_current_user)):
+    await verify_workspace_access(user, task_data.workspace_id)
+    await verify_assignee(task_data.workspace_id, task_data.assignee_id)
+    
+    task_doc = build_task_doc(task_data)
+    # Insert a copy so the driver's _id never reaches the payload
+    await db.tasks.insert_one(dict(task_doc))
+    seqs = await record_task_changes(task_data.workspace_id, [(None, task_doc)])
+    
+    # Populate assignee
+    await attach_assignees([task_doc])
+    
+    # Broadcast to workspace
+    await manager.broadcast_to_workspace(task_data.workspace_id, {
+        "type": "task_created",
+        "seq": seqs[0],
+        "task": task_doc
+    })
+    
+    # Generation runs on the job workers; the task_ai_complete event follows
+    if task_doc["ai_status"] == "pending":
+        ai_jobs.enqueue(task_doc)
+    
+    return json_response({"task": task_doc})
+
+BULK_CONFLICT = "Task was modified by someone else"
+
+async def bulk_conflicts(op_items: List[int], changes: dict, failed: dict, matched: int, deleted: int) -> dict:
+    """Updates and deletes whose version filter matched nothing, by op index"""
+    guarded = [n for n, i in enumerate(op_items) if changes[i][1] is not None and n not in failed]
+    updates = sum(1 for n in guarded if changes[op_items[n]][2] is not None)
+    if matched >= updates and deleted >= len(guarded) - updates:
+        return {}
+    
+    # Some task changed between the read and the write; find which from where each one stands now
+    ids = [changes[op_items[n]][1]["id"] for n in guarded]
+    docs = await db.tasks.find({"id": {"$in": ids}}, {"_id": 0, "id": 1, "version": 1, "updated_at": 1}).to_list(len(ids))
+    current = {t["id"]: t for t in docs}
+    conflicts = {}
+    for n in guarded:
+        _, before, after = changes[op_items[n]]
+        if after is None:
+            applied = before["id"] not in current
+        else:
+            # A racing writer can land on the same version; our updated_at tells the writes apart
+            task = current.get(before["id"], {})
+            applied = task.get("version") == after["version"] and task.get("updated_at") == after["updated_at"]
+        if not applied:
+            conflicts[n] = BULK_CONFLICT
+    if len(guarded) - len(conflicts) != matched + deleted:
+        # Another writer landed right after ours, so attribution is a guess
+        logging.warning("Bulk task write outcome was ambiguous; run reconcile-stats if analytics drift")
+    return conflicts
+
+@api_router.post("/tasks/bulk")
+async def bulk_tasks(bulk: BulkTaskRequest, user: dict = Depends(get_current_user)):
+    results = [{"index": i, "op": item.op.value, "ok": False} for i, item in enumerate(bulk.operations)]
+    
+    # Load every task touched by an update or delete in one query
+    existing_ids = [item.task_id for item in bulk.operations if item.op != BulkTaskOp.CREATE and item.task_id]
+    existing = {}
+    if existing_ids:
+        docs = await db.tasks.find({"id": {"$in": existing_ids}}, {"_id": 0}).to_list(len(existing_ids))
+        existing = {t["id"]: t for t in docs}
+    # Every pair is computed from the one read above, so a task may only be touched once
+    occurrences = {}
+    for task_id in existing_ids:
+        occurrences[task_id] = occurrences.get(task_id, 0) + 1
+    
+    # Resolve each item's workspace and validate its payload
+    item_workspaces = {}
+    for i, item in enumerate(bulk.operations):
+        if item.op == BulkTaskOp.CREATE:
+            if not item.create:
+                results[i]["error"] = "create payload is required"
+                continue
+            item_workspaces[i] = item.create.workspace_id
+        else:
+            if item.op == BulkTaskOp.UPDATE and not item.update:
+                results[i]["error"] = "update payload is required"
+                continue
+            if occurrences.get(item.task_id, 0) > 1:
+                results[i]["error"] = "task_id appears more than once in this request"
+                continue
+            task = existing.get(item.task_id)
+            if not task:
+                results[i]["error"] = "Task not found"
+                continue
+            if item.version is not None and task.get("version") != item.version:
+                results[i]["error"] = BULK_CONFLICT
+                continue
+            item_workspaces[i] = task["workspace_id"]
+    
+    # Check access once per workspace
+    denied = {}
+    for workspace_id in set(item_workspaces.values()):
+        try:
+            await verify_workspace_access(user, workspace_id)
+        except HTTPException as e:
+            denied[workspace_id] = e.detail
+    
+    ops, op_items, changes = [], [], {}
+    for i, workspace_id in item_workspaces.items():
+        if workspace_id in denied:
+            results[i]["error"] = denied[workspace_id]
+            continue
+        item = bulk.operations[i]
+        if item.op != BulkTaskOp.DELETE:
+            payload = item.create if item.op == BulkTaskOp.CREATE else item.update
+            try:
+                await verify_assignee(workspace_id, payload.assignee_id)
+            except HTTPException as e:
+                results[i]["error"] = e.detail
+                continue
+        if item.op == BulkTaskOp.CREATE:
+            before, after = None, build_task_doc(item.create)
+            ops.append(InsertOne(dict(after)))
+        elif item.op == BulkTaskOp.UPDATE:
+            update_data = task_update_fields(item.update)
+            before = existing[item.task_id]
+            after = {**before, **update_data, "version": before.get("version", 0) + 1}
+            ops.append(UpdateOne({"id": item.task_id, "version": before.get("version")}, {"$set": update_data, "$inc": {"version": 1}}))
+        else:
+            before, after = existing[item.task_id], None
+            ops.append(DeleteOne({"id": item.task_id, "version": before.get("version")}))
+        op_items.append(i)
+        changes[i] = (workspace_id, before, after)
+    
+    failed = {}
+    if ops:
+        try:
+            result = await db.tasks.bulk_write(ops, ordered=False)
+            matched, deleted = result.matched_count, result.deleted_count
+        except BulkWriteError as e:
+            failed = {err["index"]: err.get("errmsg", "Write failed") for err in e.details.get("writeErrors", [])}
+            matched, deleted = e.details.get("nMatched", 0), e.details.get("nRemoved", 0)
+        failed.update(await bulk_conflicts(op_items, changes, failed, matched, deleted))
+    
+    applied = [i for n, i in enumerate(op_items) if n not in failed]
+    for n, error in failed.items():
+        results[op_items[n]]["error"] = error
+    
+    # Populate assignees for every created or updated task at once
+    await attach_assignees([changes[i][2] for i in applied if changes[i][2]])
+    
+    batches = {}
+    for i in applied:
+        workspace_id, before, after = changes[i]
+        batch = batches.setdefault(workspace_id, {"changes": [], "created": [], "updated": [], "deleted": []})
+        batch["changes"].append((before, after))
+        results[i]["ok"] = True
+        if after is None:
+            results[i]["task_id"] = before["id"]
+            batch["deleted"].append(before["id"])
+        else:
+            results[i]["task"] = after
+            batch["created" if before is None else "updated"].append(results[i]["task"])
+    
+    # One stats update and one coalesced event per workspace
+    for workspace_id, batch in batches.items():
+        seqs = await record_task_changes(workspace_id, batch.pop("changes"))
+        await manager.broadcast_to_workspace(workspace_id, {
+            "type": "tasks_batch",
+            "first_seq": seqs[0],
+            "seq": seqs[-1],
+            **batch
+        })
+        for task in batch["created"]:
+            if task["ai_status"] == "pending":
+                ai_jobs.enqueue(task)
+    
+    return json_response({"results": results})
 
-    updated_task = await db.tasks.find_one({"id": task_id}, {"_id": 0})
+def parse_if_match(if_match: Optional[str]) -> Optional[int]:
+    """Task version from an If-Match header such as "3" or W/"3" """
+    if not if_match:
+        return None
+    try:
+        return int(if_match.strip().removeprefix("W/").strip('"'))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid If-Match header")
 
-    # Populate assignee
-    if updated_task.get("assignee_id"):
-        assignee = await db.users.find_one(
-            {"id": updated_task["assignee_id"]},
-            {"_id": 0, "password": 0}
-        )
-        if assignee:
-            updated_task["assignee"] = serialize_doc(assignee)
+@api_router.patch("/tasks/{task_id}")
+async def update_task(
+    task_id: str,
+    task_update: TaskUpdate,
+    response: Response,
+    full: bool = False,
+    if_match: Optional[str] = Header(None),
+    user: dict = Depends(get_current_user)
+):
+    update_data = task_update_fields(task_update)
+    if update_data.get("assignee_id"):
+        # Tasks never change workspace, so the assignee can be checked before the write
+        current = await db.tasks.find_one({"id": task_id}, {"_id": 0, "workspace_id": 1})
+        if current:
+            await verify_workspace_access(user, current["workspace_id"])
+            await verify_assignee(current["workspace_id"], update_data["assignee_id"])
+    
+    # Workspace scope and expected version live in the filter, so one round trip
+    # both authorizes and applies the update, and concurrent writers can't interleave
+    query = {"id": task_id, "workspace_id": {"$in": user.get("workspaces", [])}}
+    expected_version = parse_if_match(if_match)
+    if expected_version is not None:
+        query["version"] = expected_version if expected_version > 0 else {"$exists": False}
+    
+    update = {"$set": update_data, "$inc": {"version": 1}}
+    task = await db.tasks.find_one_and_update(query, update, projection={"_id": 0}, return_document=ReturnDocument.BEFORE)
+    if not task:
+        # Slow path: work out why nothing matched
+        current = await db.tasks.find_one({"id": task_id}, {"_id": 0, "workspace_id": 1, "version": 1})
+        if not current:
+            raise HTTPException(status_code=404, detail="Task not found")
+        await verify_workspace_access(user, current["workspace_id"])
+        if expected_version is None or current.get("version", 0) == expected_version:
+            # Membership is the source of truth; the cached principal's workspace list was stale
+            invalidate_user(user["id"])
+            query["workspace_id"] = current["workspace_id"]
+            task = await db.tasks.find_one_and_update(query, update, projection={"_id": 0}, return_document=ReturnDocument.BEFORE)
+        if not task:
+            current = await db.tasks.find_one({"id": task_id}, {"_id": 0, "version": 1})
+            if not current:
+                raise HTTPException(status_code=404, detail="Task not found")
+            raise HTTPException(status_code=409, detail={
+                "message": "Task was modified by someone else",
+                "version": current.get("version", 0)
+            })
+    
+    updated_task = {**task, **update_data, "version": task.get("version", 0) + 1}
+    response.headers["ETag"] = f'"{updated_task["version"]}"'
+    seqs = await record_task_changes(task["workspace_id"], [(task, updated_task)])
+
+    # Only the changed fields go over the wire, with a slim assignee card if it changed
+    changes = task_diff(task, updated_task)
+    if "assignee_id" in changes:
+        assignees = await load_users([changes["assignee_id"]], USER_CARD_PROJECTION)
+        changes["assignee"] = assignees.get(changes["assignee_id"])
+    diff = {"task_id": task_id, "version": updated_task["version"], "changes": changes}
 
     # Broadcast to workspace
     await manager.broadcast_to_workspace(task["workspace_id"], {
         "type": "task_updated",
-        "task": serialize_doc(updated_task)
+        "seq": seqs[0],
+        **diff
     })
 
-    return {"task": serialize_doc(updated_task)}
+    if full:
+        # Populate assignee
+        await attach_assignees([updated_task])
+        return json_response({"task": updated_task}, response)
+    return json_response(diff, response)
 
 @api_router.delete("/tasks/{task_id}")
 async def delete_task(task_id: str, user: dict = Depends(get_current_user)):
@@ -936,87 +2850,201 @@ async def delete_task(task_id: str, user: dict = Depends(get_current_user)):
     
     await verify_workspace_access(user, task["workspace_id"])
     
-    await db.tasks.delete_one({"id": task_id})
+    # Only the request that actually removed the task records it, so a
+    # concurrent delete can't subtract it from the rollups twice
+    task = await db.tasks.find_one_and_delete({"id": task_id, "workspace_id": task["workspace_id"]}, projection={"_id": 0})
+    if not task:
+        raise HTTPException(status_code=404, detail="Task not found")
+    seqs = await record_task_changes(task["workspace_id"], [(task, None)])
     
     # Broadcast to workspace
     await manager.broadcast_to_workspace(task["workspace_id"], {
         "type": "task_deleted",
+        "seq": seqs[0],
         "task_id": task_id
     })
     
     return {"message": "Task deleted"}
 
-# Analytics routes
-@api_router.get("/analytics/{workspace_id}")
-async def get_analytics(workspace_id: str, user: dict = Depends(get_current_user)):
+@api_router.get("/tasks/{workspace_id}/changes")
+async def get_task_changes(
+    workspace_id: str,
+    since: int = Query(0, ge=0),
+    limit: int = Query(500, ge=1, le=1000),
+    user: dict = Depends(get_current_user)
+):
     await verify_workspace_access(user, workspace_id)
     
-    tasks = await db.tasks.find({"workspace_id": workspace_id}, {"_id": 0}).to_list(1000)
-    
-    total_tasks = len(tasks)
-    completed_tasks = len([t for t in tasks if t["status"] == "done"])
-    
-    # Tasks by status
-    tasks_by_status = {}
-    for task in tasks:
-        status = task["status"]
-        tasks_by_status[status] = tasks_by_status.get(status, 0) + 1
+    return json_response(await read_changes(workspace_id, since, limit))
+
+@api_router.get("/me/tasks")
+async def get_my_tasks(
+    workspace_id: Optional[str] = None,
+    status: Optional[List[TaskStatus]] = Query(None),
+    priority: Optional[List[TaskPriority]] = Query(None),
+    due_before: Optional[datetime] = None,
+    due_after: Optional[datetime] = None,
+    sort: MyTasksSort = MyTasksSort.DUE_DATE,
+    order: str = Query("asc", pattern="^(asc|desc)$"),
+    limit: int = Query(500, ge=1, le=1000),
+    user: dict = Depends(get_current_user)
+):
+    workspaces = user.get("workspaces", [])
+    if workspace_id:
+        await verify_workspace_access(user, workspace_id)
+        workspaces = [workspace_id]
+    
+    # Served by the (assignee_id, status, due_date) index
+    query = {"assignee_id": user["id"], "workspace_id": {"$in": workspaces}}
+    if status:
+        query["status"] = {"$in": [s.value for s in status]}
+    if priority:
+        query["priority"] = {"$in": [p.value for p in priority]}
+    if due_before or due_after:
+        query["due_date"] = {}
+        if due_after:
+            query["due_date"]["$gte"] = due_after.isoformat()
+        if due_before:
+            query["due_date"]["$lt"] = due_before.isoformat()
+    
+    direction = 1 if order == "asc" else -1
+    if sort == MyTasksSort.PRIORITY:
+        # Priorities sort by urgency, not alphabetically
+        tasks = await db.tasks.aggregate([
+            {"$match": query},
+            {"$addFields": {"priority_rank": {"$indexOfArray": [PRIORITY_RANK, "$priority"]}}},
+            {"$sort": {"priority_rank": direction, "due_date": 1, "id": 1}},
+            {"$limit": limit},
+            {"$project": {"_id": 0, "priority_rank": 0}}
+        ]).to_list(limit)
+    else:
+        tasks = await db.tasks.find(query, {"_id": 0}).sort(
+            [(sort.value, direction), ("id", 1)]
+        ).limit(limit).to_list(limit)
     
-    # Tasks by priority
-    tasks_by_priority = {}
-    for task in tasks:
-        priority = task["priority"]
-        tasks_by_priority[priority] = tasks_by_priority.get(priority, 0) + 1
+    # Populate assignee details
+    await attach_assignees(tasks, USER_SUMMARY_PROJECTION)
     
-    # Weekly data (last 7 days)
+    return json_response({"tasks": tasks})
+
+# Analytics routes
+def weekly_series(completed_by_day: Dict[str, int], days: int) -> List[dict]:
+    today = datetime.now(timezone.utc).date()
     weekly_data = []
-    for i in range(6, -1, -1):
-        date = datetime.now(timezone.utc) - timedelta(days=i)
-        date_str = date.date().isoformat()
-        
-        completed_on_date = 0
-        for task in tasks:
-            if task["status"] == "done" and task.get("updated_at"):
-                try:
-                    updated_date = datetime.fromisoformat(task["updated_at"]).date()
-                    if updated_date == date.date():
-                        completed_on_date += 1
-                except:
-                    pass
-        
+    for i in range(days - 1, -1, -1):
+        date_str = (today - timedelta(days=i)).isoformat()
         weekly_data.append({
             "date": date_str,
-            "completed": completed_on_date
+            "completed": completed_by_day.get(date_str, 0)
         })
+    return weekly_data
+
+async def load_workspace_stats(workspace_id: str) -> dict:
+    stats = await db.workspace_stats.find_one({"workspace_id": workspace_id}, {"_id": 0})
+    if stats is None:
+        stats = await rebuild_workspace_stats(workspace_id)
+    return stats
+
+def open_by_assignee(stats: dict) -> Dict[str, int]:
+    return {unquote(k): v for k, v in counter_values(stats.get("open_by_assignee")).items()}
+
+def open_assignees(stats: dict) -> List[str]:
+    return list(open_by_assignee(stats))
+
+def analytics_payload(stats: dict, days: int, assignees: Dict[str, dict]) -> dict:
+    """Shape a workspace_stats rollup into the analytics response"""
+    tasks_by_status = counter_values(stats.get("status"))
+    tasks_by_priority = counter_values(stats.get("priority"))
+    total = stats.get("total", 0)
     
     # Workload by assignee
-    workload = {}
-    for task in tasks:
-        if task.get("assignee_id") and task["status"] != "done":
-            assignee_id = task["assignee_id"]
-            if assignee_id not in workload:
-                assignee = await db.users.find_one({"id": assignee_id}, {"_id": 0, "password": 0})
-                if assignee:
-                    workload[assignee_id] = {
-                        "name": assignee.get("name"),
-                        "avatar": assignee.get("avatar"),
-                        "tasks": 0
-                    }
-            if assignee_id in workload:
-                workload[assignee_id]["tasks"] += 1
+    workload = [
+        {
+            "name": assignees[assignee_id].get("name"),
+            "avatar": assignees[assignee_id].get("avatar"),
+            "tasks": count
+        }
+        for assignee_id, count in open_by_assignee(stats).items() if assignee_id in assignees
+    ]
     
     return {
-        "total_tasks": total_tasks,
-        "completed_tasks": completed_tasks,
+        "total_tasks": total if isinstance(total, int) else 0,
+        "completed_tasks": tasks_by_status.get("done", 0),
         "tasks_by_status": tasks_by_status,
         "tasks_by_priority": tasks_by_priority,
-        "weekly_data": weekly_data,
-        "workload": list(workload.values())
+        "weekly_data": weekly_series(counter_values(stats.get("completed_by_day")), days),
+        "workload": workload
     }
 
+@api_router.get("/analytics/{workspace_id}")
+async def get_analytics(workspace_id: str, response: Response, days: int = Query(7, ge=1, le=365), if_none_match: Optional[str] = Header(None), user: dict = Depends(get_current_user)):
+    await verify_workspace_access(user, workspace_id)
+    
+    # The weekly window moves with the calendar day
+    today = datetime.now(timezone.utc).date().isoformat()
+    not_modified = await check_etag(response, if_none_match, workspace_id, ("tasks", "members"), days, today)
+    if not_modified:
+        return not_modified
+    
+    stats = await load_workspace_stats(workspace_id)
+    assignees = await load_users(open_assignees(stats))
+    
+    return json_response(analytics_payload(stats, days, assignees), response)
+
+@api_router.get("/dashboard/{workspace_id}")
+async def get_dashboard(
+    workspace_id: str,
+    response: Response,
+    days: int = Query(7, ge=1, le=365),
+    tasks_limit: int = Query(20, ge=1, le=100),
+    if_none_match: Optional[str] = Header(None),
+    user: dict = Depends(get_current_user)
+):
+    """Analytics, the caller's recent tasks, members and projects in one round trip"""
+    await verify_workspace_access(user, workspace_id)
+    
+    today = datetime.now(timezone.utc).date().isoformat()
+    not_modified = await check_etag(
+        response, if_none_match, workspace_id, ("tasks", "members", "projects"),
+        user["id"], days, tasks_limit, today
+    )
+    if not_modified:
+        return not_modified
+    
+    workspace = await load_workspace_members(workspace_id)
+    my_tasks_query = {"assignee_id": user["id"], "workspace_id": workspace_id}
+    users, stats, recent_tasks, my_task_count, projects = await asyncio.gather(
+        load_users((m["user_id"] for m in workspace.get("members", [])), USER_SUMMARY_PROJECTION),
+        load_workspace_stats(workspace_id),
+        db.tasks.find(my_tasks_query, CARD_PROJECTION).sort([("updated_at", -1), ("id", 1)]).to_list(tasks_limit),
+        db.tasks.count_documents(my_tasks_query),
+        db.projects.find({"workspace_id": workspace_id}, {"_id": 0}).to_list(100)
+    )
+    
+    # Members double as the assignee lookup; only former members need another query
+    missing = [uid for uid in open_assignees(stats) if uid not in users]
+    if missing:
+        users.update(await load_users(missing, USER_SUMMARY_PROJECTION))
+    
+    for task in recent_tasks:
+        if task.get("assignee_id") in users:
+            task["assignee"] = users[task["assignee_id"]]
+    
+    return json_response({
+        "analytics": analytics_payload(stats, days, users),
+        "recent_tasks": recent_tasks,
+        "my_task_count": my_task_count,
+        "members": [
+            member_details(m["user_id"], users[m["user_id"]], m["role"])
+            for m in workspace.get("members", []) if m["user_id"] in users
+        ],
+        "projects": projects
+    }, response)
+
+
 # Webhook endpoint
-@api_router.post("/webhooks")
-async def handle_webhook(webhook: WebhookEvent):
+@api_router.post("/webhooks", status_code=202)
+async def handle_webhook(webhook: WebhookEvent, idempotency_key: Optional[str] = Header(None)):
     WEBHOOK_SECRET = os.environ.get('WEBHOOK_SECRET', 'dev-webhook-secret')
     
     if webhook.secret != WEBHOOK_SECRET:
@@ -1027,28 +3055,22 @@ async def handle_webhook(webhook: WebhookEvent):
     
     logging.info(f"Webhook received: {webhook.event}")
     
-    if webhook.event == "ai.task_complete":
-        task_id = webhook.data.get("task_id")
-        subtasks = webhook.data.get("subtasks", [])
-        workspace_id = webhook.data.get("workspace_id")
-        
-        if task_id:
-            await db.tasks.update_one(
-                {"id": task_id},
-                {"$set": {
-                    "subtasks": subtasks,
-                    "ai_generated": True,
-                    "updated_at": datetime.now(timezone.utc).isoformat()
-                }}
-            )
-            
-            # Broadcast update
-            if workspace_id:
-                await manager.broadcast_to_workspace(workspace_id, {
-                    "type": "task_ai_complete",
-                    "task_id": task_id
-                })
+    # Acknowledge once the event is journaled; the applier writes it in the next batch
+    try:
+        await db.get_collection("webhook_events", write_concern=WriteConcern(w="majority", j=True)).insert_one({
+            "_id": webhook_key(webhook, idempotency_key),
+            "event": webhook.event,
+            "data": webhook.data,
+            "status": "queued",
+            "attempts": 0,
+            "received_at": datetime.now(timezone.utc)
+        })
+    except DuplicateKeyError:
+        webhook_events.inc("duplicate")
+        return {"received": True, "duplicate": True}
     
+    webhook_events.inc("queued")
+    webhook_applier.notify()
     return {"received": True}
 
 # AI subtask generation endpoint
@@ -1060,37 +3082,303 @@ async def generate_subtasks(data: dict, user: dict = Depends(get_current_user)):
         raise HTTPException(status_code=400, detail="Prompt is required")
     
     try:
-        # Use a simple LLM-style generation (mock for now, replace with actual LLM)
-        import re
-        
-        # Extract task title
-        task_match = re.search(r'Task: (.+?)(?:\n|$)', prompt)
-        task_title = task_match.group(1) if task_match else "task"
-        
-        # Generate subtasks based on common patterns
-        subtasks = [
-            {"title": f"Research and plan {task_title}", "completed": False},
-            {"title": f"Implement core functionality", "completed": False},
-            {"title": f"Test and validate results", "completed": False},
-            {"title": f"Document and review", "completed": False}
-        ]
-        
-        return {"subtasks": subtasks}
+        # Repeated prompts come from the cache and identical ones in flight share a generation
+        return {"subtasks": await ai_jobs.subtasks_for(prompt)}
     except Exception as e:
         logging.error(f"AI generation error: {e}")
         raise HTTPException(status_code=500, detail="Failed to generate subtasks")
 
 # WebSocket endpoint
 @app.websocket("/ws/{workspace_id}")
-async def websocket_endpoint(websocket: WebSocket, workspace_id: str):
-    await manager.connect(websocket, workspace_id)
+async def websocket_endpoint(websocket: WebSocket, workspace_id: str, since: Optional[int] = None, token: Optional[str] = None):
+    # Browsers can't set headers on a WebSocket, so the bearer token may also come as ?token=
+    authorization = websocket.headers.get("authorization") or (f"Bearer {token}" if token else None)
+    try:
+        user = await get_current_user(authorization)
+        await verify_workspace_access(user, workspace_id)
+    except HTTPException:
+        # Refused before accept: nothing is replayed or delivered
+        await websocket.close(code=1008)
+        return
+    
+    # Resume handshake: ?since=<seq> replays missed changes before live events.
+    # Live events carry seq too, so clients drop any with seq <= the replay's last_seq.
+    backlog = None
+    if since is not None:
+        async def backlog():
+            return {"type": "changes", **await read_changes(workspace_id, since, 1000)}
+    await manager.connect(websocket, workspace_id, backlog)
     try:
         while True:
             data = await websocket.receive_text()
             # Echo or process messages if needed
     except WebSocketDisconnect:
+        pass
+    finally:
         manager.disconnect(websocket, workspace_id)
 
+# Request metrics
+route_paths: Dict[Any, str] = {}
+
+def route_template(scope: dict) -> str:
+    """The matched route's path template, so labels stay bounded whatever the URL"""
+    endpoint = scope.get("endpoint")
+    if endpoint is None:
+        return "unmatched"
+    if not route_paths:
+        route_paths.update({route.endpoint: route.path for route in app.routes if hasattr(route, "endpoint")})
+    return route_paths.get(endpoint, "unmatched")
+
+def record_request(scope: dict, status: int, seconds: float, request: RequestMetrics):
+    method, route = scope["method"], route_template(scope)
+    http_request_seconds.observe(seconds, method, route, str(status))
+    request_mongo_commands.observe(request.commands, method, route)
+    request_mongo_seconds.observe(request.command_seconds, method, route)
+    
+    repeated = {shape: count for shape, count in request.shapes.items() if count >= N_PLUS_ONE_THRESHOLD}
+    if repeated:
+        n_plus_one_requests.inc(method, route)
+    if seconds * 1000 > SLOW_REQUEST_MS or request.commands > SLOW_REQUEST_DB_CALLS or repeated:
+        logging.warning(json.dumps({
+            "event": "slow_request",
+            "method": method,
+            "route": route,
+            "path": scope["path"],
+            "status": status,
+            "duration_ms": round(seconds * 1000, 1),
+            "mongo_commands": request.commands,
+            "mongo_ms": round(request.command_seconds * 1000, 1),
+            "repeated_commands": repeated
+        }))
+
+class MetricsMiddleware:
+    """Times each HTTP request, including streamed bodies, and attributes its MongoDB commands to the route"""
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        request = RequestMetrics()
+        token = current_request.set(request)
+        status = 500
+        started = time.perf_counter()
+        
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+        
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            current_request.reset(token)
+            record_request(scope, status, time.perf_counter() - started, request)
+
+def render_metrics() -> str:
+    lines = []
+    for metric in (http_request_seconds, request_mongo_commands, request_mongo_seconds, n_plus_one_requests,
+                   mongo_command_seconds, mongo_command_failures, ws_delivery_seconds,
+                   webhook_events, webhook_batch_size, webhook_apply_lag_seconds):
+        lines.extend(metric.render())
+    
+    lines += ["# HELP devpulse_ws_connections Open WebSocket connections on this worker",
+              "# TYPE devpulse_ws_connections gauge"]
+    for workspace_id, connections in sorted(manager.active_connections.items()):
+        lines.append(f'devpulse_ws_connections{{{format_labels(("workspace",), (workspace_id,))}}} {len(connections)}')
+    lines += ["# HELP devpulse_ws_dropped_total Slow WebSocket consumers disconnected on queue overflow",
+              "# TYPE devpulse_ws_dropped_total counter",
+              f"devpulse_ws_dropped_total {manager.dropped}",
+              "# HELP devpulse_ws_publish_failures_total Broadcasts the backend failed to publish",
+              "# TYPE devpulse_ws_publish_failures_total counter",
+              f"devpulse_ws_publish_failures_total {manager.publish_failures + manager.backend.failures}"]
+    
+    caches = {"tokens": token_cache, "principals": principal_cache, "memberships": membership_cache}
+    for field, kind, help_text in (("hits", "counter", "Auth cache hits"), ("misses", "counter", "Auth cache misses"),
+                                   ("size", "gauge", "Auth cache entries")):
+        name = f"devpulse_auth_cache_{field}" + ("_total" if kind == "counter" else "")
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+        for cache_name, cache in caches.items():
+            lines.append(f'{name}{{cache="{cache_name}"}} {cache.stats()[field]}')
+    
+    hashing = password_hasher.stats()
+    for field, name, kind, help_text in (
+        ("pending", "devpulse_password_hash_pending", "gauge", "Password hashes queued or running"),
+        ("calls", "devpulse_password_hash_calls_total", "counter", "Password hashes computed"),
+        ("rejected", "devpulse_password_hash_rejected_total", "counter", "Password hashes rejected with 503"),
+        ("queued_seconds", "devpulse_password_hash_queued_seconds_total", "counter", "Time hashes waited for a worker"),
+        ("hashing_seconds", "devpulse_password_hash_seconds_total", "counter", "Time spent hashing")
+    ):
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}", f"{name} {hashing[field]}"]
+    
+    jobs = ai_jobs.stats()
+    jobs.update({f"cache_{field}": value for field, value in jobs.pop("cache").items()})
+    for field, name, kind, help_text in (
+        ("queued", "devpulse_ai_jobs_queued", "gauge", "AI subtask jobs waiting for a worker"),
+        ("running", "devpulse_ai_jobs_running", "gauge", "AI subtask jobs being generated or applied"),
+        ("completed", "devpulse_ai_jobs_completed_total", "counter", "AI subtask jobs applied to their task"),
+        ("failed", "devpulse_ai_jobs_failed_total", "counter", "AI subtask jobs that exhausted their retries"),
+        ("retries", "devpulse_ai_generation_retries_total", "counter", "AI generation attempts retried"),
+        ("deduplicated", "devpulse_ai_generation_deduplicated_total", "counter", "Prompts that joined an identical generation in flight"),
+        ("generated", "devpulse_ai_generations_total", "counter", "AI generations run to completion"),
+        ("cache_hits", "devpulse_ai_cache_hits_total", "counter", "AI subtask cache hits"),
+        ("cache_misses", "devpulse_ai_cache_misses_total", "counter", "AI subtask cache misses"),
+        ("cache_size", "devpulse_ai_cache_size", "gauge", "AI subtask cache entries")
+    ):
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}", f"{name} {jobs[field]}"]
+    
+    return "\n".join(lines) + "\n"
+
+@app.get("/metrics")
+async def metrics(authorization: Optional[str] = Header(None)):
+    if METRICS_TOKEN and authorization != f"Bearer {METRICS_TOKEN}":
+        raise HTTPException(status_code=401, detail="Not authenticated")
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+# Profiling
+PROFILE_TOKEN = os.environ.get('PROFILE_TOKEN')
+# Profile one in N requests per route into the ring buffer (0 disables sampling)
+PROFILE_SAMPLE_EVERY = int(os.environ.get('PROFILE_SAMPLE_EVERY', 0))
+PROFILE_BUFFER_SIZE = int(os.environ.get('PROFILE_BUFFER_SIZE', 50))
+PROFILE_INTERVAL_SECONDS = float(os.environ.get('PROFILE_INTERVAL_SECONDS', 0.001))
+
+try:
+    from pyinstrument import Profiler
+except ImportError:
+    Profiler = None
+
+def folded_stacks(frame, prefix: str = "") -> List[str]:
+    """Collapse a pyinstrument frame tree into folded stacks (flamegraph.pl, speedscope), weighted in microseconds"""
+    name = frame.function if frame.is_synthetic else f"{frame.function} ({frame.file_path_short}:{frame.line_no})"
+    stack = f"{prefix};{name}" if prefix else name
+    lines = []
+    weight = int((frame.time - sum(child.time for child in frame.children)) * 1_000_000)
+    if weight:
+        lines.append(f"{stack} {weight}")
+    for child in frame.children:
+        lines.extend(folded_stacks(child, stack))
+    return lines
+
+def match_route(scope: dict) -> str:
+    for route in app.router.routes:
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return route.path
+    return "unmatched"
+
+def profile_requested(scope: dict) -> bool:
+    """True when the request carries the profile token in X-Profile-Token or ?_profile="""
+    supplied = dict(scope["headers"]).get(b"x-profile-token", b"").decode()
+    if not supplied and b"_profile=" in scope["query_string"]:
+        supplied = parse_qs(scope["query_string"].decode()).get("_profile", [""])[0]
+    return bool(supplied) and secrets.compare_digest(supplied, PROFILE_TOKEN)
+
+class ProfileStore:
+    """Ring buffer of recent request profiles plus the per-route sampling counters"""
+    def __init__(self, size: int):
+        self.profiles: deque = deque(maxlen=size)
+        self.seen: Dict[str, int] = {}
+
+    def should_sample(self, route: str) -> bool:
+        count = self.seen.get(route, 0) + 1
+        self.seen[route] = count
+        return count % PROFILE_SAMPLE_EVERY == 0
+
+    def add(self, profile: dict):
+        self.profiles.append(profile)
+
+    def get(self, profile_id: str) -> Optional[dict]:
+        return next((p for p in self.profiles if p["id"] == profile_id), None)
+
+profile_store = ProfileStore(PROFILE_BUFFER_SIZE)
+
+class ProfilingMiddleware:
+    """Samples the call stack of requests that ask for it, and of one in PROFILE_SAMPLE_EVERY per route"""
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        # The token check is cheap; only resolve the route once a request may be profiled
+        trigger, route = None, None
+        if PROFILE_TOKEN and profile_requested(scope):
+            trigger = "requested"
+        elif PROFILE_SAMPLE_EVERY:
+            route = match_route(scope)
+            if profile_store.should_sample(route):
+                trigger = "sampled"
+        if trigger is None:
+            await self.app(scope, receive, send)
+            return
+        route = route or match_route(scope)
+        
+        profile_id = str(ObjectId())
+        status = 500
+        
+        async def send_with_profile_id(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                message["headers"] = list(message.get("headers", [])) + [(b"x-profile-id", profile_id.encode())]
+            await send(message)
+        
+        # async_mode keeps other requests' work on this loop out of the profile
+        profiler = Profiler(interval=PROFILE_INTERVAL_SECONDS, async_mode="enabled")
+        profiler.start()
+        try:
+            await self.app(scope, receive, send_with_profile_id)
+        finally:
+            session = profiler.stop()
+            try:
+                root = session.root_frame()
+                profile_store.add({
+                    "id": profile_id,
+                    "trigger": trigger,
+                    "method": scope["method"],
+                    "route": route,
+                    "path": scope["path"],
+                    "status": status,
+                    "duration_ms": round(session.duration * 1000, 1),
+                    "samples": session.sample_count,
+                    "created_at": datetime.now(timezone.utc).isoformat(),
+                    "folded": folded_stacks(root) if root else []
+                })
+            except Exception as e:
+                # A diagnostics failure must never fail the request it observed
+                logging.error(f"Recording profile {profile_id} failed: {e}")
+
+def require_profile_token(x_profile_token: Optional[str] = Header(None)):
+    if not PROFILE_TOKEN:
+        raise HTTPException(status_code=404, detail="Profiling is not enabled")
+    if not x_profile_token or not secrets.compare_digest(x_profile_token, PROFILE_TOKEN):
+        raise HTTPException(status_code=401, detail="Not authenticated")
+
+@app.get("/debug/profiles", dependencies=[Depends(require_profile_token)])
+async def list_profiles():
+    return [{k: v for k, v in p.items() if k != "folded"} for p in reversed(profile_store.profiles)]
+
+@app.get("/debug/profiles/export", dependencies=[Depends(require_profile_token)])
+async def export_profiles():
+    """Every buffered profile as one folded-stack file, rooted at its route"""
+    lines = [
+        f"{p['method']} {p['route']};{line}"
+        for p in profile_store.profiles for line in p["folded"]
+    ]
+    return PlainTextResponse("\n".join(lines) + "\n")
+
+@app.get("/debug/profiles/{profile_id}", dependencies=[Depends(require_profile_token)])
+async def get_profile(profile_id: str):
+    profile = profile_store.get(profile_id)
+    if not profile:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return PlainTextResponse("\n".join(profile["folded"]) + "\n")
+
 # Add CORS middleware BEFORE including router
 app.add_middleware(
     CORSMiddleware,
@@ -1098,7 +3386,16 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "X-Profile-Id"],
 )
+# Profiling stays out of the stack entirely unless configured
+if PROFILE_TOKEN or PROFILE_SAMPLE_EVERY:
+    if Profiler is None:
+        print("[ERROR] PROFILE_TOKEN/PROFILE_SAMPLE_EVERY set but pyinstrument is not installed; profiling disabled")
+    else:
+        app.add_middleware(ProfilingMiddleware)
+# Outermost, so timings include every other middleware
+app.add_middleware(MetricsMiddleware)
 
 # Include router
 app.include_router(api_router)
@@ -1111,6 +3408,39 @@ logger = logging.getLogger(__name__)
 
 
 if __name__ == "__main__":
+    import sys
+    
+    # python server.py reconcile-stats [--fix]
+    if len(sys.argv) > 1 and sys.argv[1] == "reconcile-stats":
+        import asyncio
+        report = asyncio.run(reconcile_workspace_stats(fix="--fix" in sys.argv))
+        print(json.dumps(report, indent=2))
+        print(f"[INFO] {len(report)} workspace(s) with drift")
+        sys.exit(1 if report and "--fix" not in sys.argv else 0)
+    
+    # python server.py check-indexes
+    if len(sys.argv) > 1 and sys.argv[1] == "check-indexes":
+        import asyncio
+        async def check_indexes():
+            return await ensure_indexes(), await find_collection_scans()
+        failed, offenders = asyncio.run(check_indexes())
+        for name in failed:
+            print(f"[ERROR] Index could not be created: {name}")
+        for command in offenders:
+            print(f"[ERROR] COLLSCAN: {json.dumps(command)}")
+        print(f"[INFO] {len(QUERY_CATALOGUE) - len(offenders)}/{len(QUERY_CATALOGUE)} queries use an index")
+        sys.exit(1 if failed or offenders else 0)
+    
+    # python server.py archive-tasks
+    if len(sys.argv) > 1 and sys.argv[1] == "archive-tasks":
+        import asyncio
+        archived = asyncio.run(archive_done_tasks())
+        if archived is None:
+            print("[INFO] Another worker is archiving right now; try again later")
+        else:
+            print(f"[INFO] Archived {archived} task(s) done for more than {ARCHIVE_AFTER_DAYS} days")
+        sys.exit(0)
+    
     import uvicorn
     port = int(os.environ.get("PORT", 8000))
     uvicorn.run(app, host="0.0.0.0", port=port)
@@ -5,19 +5,19 @@ import { toast } from 'sonner';
 const SocketContext = createContext(null);
 
 export const SocketProvider = ({ children }) => {
-  const { workspaceId, API_URL } = useAuth();
+  const { workspaceId, token, API_URL } = useAuth();
   const [socket, setSocket] = useState(null);
 
   useEffect(() => {
-    if (!workspaceId || !API_URL) return;
+    if (!workspaceId || !token || !API_URL) return;
 
-    const wsUrl = `${API_URL.replace('http://', 'ws://').replace('https://', 'wss://')}/ws/${workspaceId}`;
+    const wsUrl = `${API_URL.replace('http://', 'ws://').replace('https://', 'wss://')}/ws/${workspaceId}?token=${encodeURIComponent(token)}`;
     
     try {
       const ws = new WebSocket(wsUrl);
 
       ws.onopen = () => {
-        console.log('WebSocket connected to', wsUrl);
+        console.log('WebSocket connected to workspace', workspaceId);
       };
 
       ws.onerror = (error) => {
@@ -38,14 +38,20 @@ export const SocketProvider = ({ children }) => {
             });
           } else if (data.type === 'task_updated') {
             toast.info('Task updated', {
-              description: data.task?.title
+              description: data.changes?.title
             });
           } else if (data.type === 'task_deleted') {
             toast.info('Task deleted');
+          } else if (data.type === 'tasks_batch') {
+            const count = data.created.length + data.updated.length + data.deleted.length;
+            toast.info(`${count} tasks changed`);
           } else if (data.type === 'task_ai_complete') {
+            const count = data.task_ids.length;
             toast.success('AI subtasks generated!', {
-              description: 'Subtasks have been created for your task'
+              description: count > 1 ? `Subtasks have been created for ${count} tasks` : 'Subtasks have been created for your task'
             });
+          } else if (data.type === 'task_ai_failed') {
+            toast.error('AI subtask generation failed');
           }
         } catch (err) {
           console.error('Failed to parse WebSocket message:', err);
@@ -62,7 +68,7 @@ export const SocketProvider = ({ children }) => {
     } catch (error) {
       console.error('Failed to create WebSocket:', error);
     }
-  }, [workspaceId, API_URL]);
+  }, [workspaceId, token, API_URL]);
 
   return (
     <SocketContext.Provider value={{ socket }}>
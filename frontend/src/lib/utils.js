@@ -4,3 +4,9 @@ import { twMerge } from "tailwind-merge"
 export function cn(...inputs) {
   return twMerge(clsx(inputs));
 }
+
+// PATCH /api/tasks/:id returns only the changed fields unless ?full=true
+export function applyTaskPatch(task, data) {
+  if (data.task) return data.task;
+  return { ...task, ...data.changes, version: data.version };
+}
@@ -71,8 +71,9 @@ const StatCard = ({ icon: Icon, label, value, change, color }) => (
 const Dashboard = () => {
   const [analytics, setAnalytics] = useState(null);
   const [myTasks, setMyTasks] = useState([]);
+  const [myTaskCount, setMyTaskCount] = useState(0);
   const [loading, setLoading] = useState(true);
-  const { token, workspaceId, API_URL, user } = useAuth();
+  const { token, workspaceId, API_URL } = useAuth();
   const navigate = useNavigate();
 
   const fetchAnalytics = async () => {
@@ -80,19 +81,12 @@ const Dashboard = () => {
     
     setLoading(true);
     try {
-      const [analyticsRes, tasksRes] = await Promise.all([
-        axios.get(`${API_URL}/api/analytics/${workspaceId}`, {
-          headers: { Authorization: `Bearer ${token}` }
-        }),
-        axios.get(`${API_URL}/api/tasks/${workspaceId}`, {
-          headers: { Authorization: `Bearer ${token}` }
-        })
-      ]);
-      setAnalytics(analyticsRes.data);
-      
-      // Filter tasks assigned to current user
-      const userTasks = tasksRes.data.tasks.filter(t => t.assignee_id === user?.id);
-      setMyTasks(userTasks);
+      const response = await axios.get(`${API_URL}/api/dashboard/${workspaceId}`, {
+        headers: { Authorization: `Bearer ${token}` }
+      });
+      setAnalytics(response.data.analytics);
+      setMyTasks(response.data.recent_tasks);
+      setMyTaskCount(response.data.my_task_count);
     } catch (error) {
       toast.error('Failed to load analytics');
       console.error(error);
@@ -304,7 +298,7 @@ const Dashboard = () => {
         <Card className="p-6 bg-white/80 backdrop-blur-sm border-slate-200">
           <div className="flex items-center justify-between mb-4">
             <h3 className="font-display font-bold text-xl text-slate-900 dark:text-slate-100">My Tasks</h3>
-            <Badge variant="secondary">{myTasks.length} tasks</Badge>
+            <Badge variant="secondary">{myTaskCount} tasks</Badge>
           </div>
           <div className="space-y-3">
             {myTasks.slice(0, 5).map(task => {
@@ -343,13 +337,13 @@ const Dashboard = () => {
               );
             })}
           </div>
-          {myTasks.length > 5 && (
+          {myTaskCount > 5 && (
             <Button
               variant="ghost"
               className="w-full mt-3"
               onClick={() => navigate('/app/projects')}
             >
-              View all {myTasks.length} tasks
+              View all {myTaskCount} tasks
               <ArrowRight className="w-4 h-4 ml-2" />
             </Button>
           )}
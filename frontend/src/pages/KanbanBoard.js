@@ -1,4 +1,4 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useRef } from 'react';
 import { useParams, useNavigate } from 'react-router-dom';
 import { motion } from 'framer-motion';
 import {
@@ -17,6 +17,8 @@ import {
 } from 'lucide-react';
 import axios from 'axios';
 import { useAuth } from '../contexts/AuthContext';
+import { useSocket } from '../contexts/SocketContext';
+import { applyTaskPatch } from '../lib/utils';
 import { Button } from '../components/ui/button';
 import { Card } from '../components/ui/card';
 import {
@@ -45,6 +47,9 @@ const statusColumns = [
   { id: 'done', label: 'Done', color: 'bg-emerald-100 dark:bg-emerald-900/30' },
 ];
 
+// Cards fetched per column; later cards load on demand
+const BOARD_PAGE_SIZE = 20;
+
 const priorityOptions = [
   { value: 'low', label: 'Low', color: 'text-slate-500' },
   { value: 'medium', label: 'Medium', color: 'text-blue-500' },
@@ -55,6 +60,10 @@ const priorityOptions = [
 const TaskCard = ({ task, onView, onUpdate, onDelete, members, isAdmin }) => {
   const priorityColor = priorityOptions.find(p => p.value === task.priority)?.color || '';
   const assignee = task.assignee;
+  // Card listings carry a description preview and subtask counts instead of the full fields
+  const description = task.description ?? task.description_preview;
+  const subtaskCount = task.subtasks ? task.subtasks.length : (task.subtask_count || 0);
+  const subtasksCompleted = task.subtasks ? task.subtasks.filter(st => st.completed).length : (task.subtasks_completed || 0);
 
   return (
     <motion.div
@@ -90,20 +99,27 @@ const TaskCard = ({ task, onView, onUpdate, onDelete, members, isAdmin }) => {
           </DropdownMenu>
         </div>
 
-        {task.description && (
-          <p className="text-xs text-slate-600 dark:text-slate-400 mb-3 line-clamp-2">{task.description}</p>
+        {description && (
+          <p className="text-xs text-slate-600 dark:text-slate-400 mb-3 line-clamp-2">{description}</p>
         )}
 
-        {task.subtasks && task.subtasks.length > 0 && (
+        {subtaskCount > 0 && (
           <div className="mb-3 p-2 bg-slate-50 dark:bg-slate-800 rounded-lg">
             <div className="flex items-center gap-1 text-xs text-slate-600 dark:text-slate-400 mb-1">
               <CheckCircle2 className="w-3 h-3" />
-              <span>{task.subtasks.filter(st => st.completed).length}/{task.subtasks.length} subtasks</span>
+              <span>{subtasksCompleted}/{subtaskCount} subtasks</span>
               {task.ai_generated && <Sparkles className="w-3 h-3 text-indigo-500 ml-1" />}
             </div>
           </div>
         )}
 
+        {task.ai_status === 'pending' && (
+          <div className="flex items-center gap-1 mb-3 text-xs text-indigo-500">
+            <Sparkles className="w-3 h-3 animate-pulse" />
+            <span>Generating subtasks...</span>
+          </div>
+        )}
+
         <div className="flex items-center justify-between text-xs">
           <div className="flex items-center gap-2">
             <Flag className={`w-3 h-3 ${priorityColor}`} />
@@ -132,14 +148,17 @@ const KanbanBoard = () => {
   const { projectId } = useParams();
   const navigate = useNavigate();
   const { token, workspaceId, API_URL, user } = useAuth();
+  const { socket } = useSocket();
   const [tasks, setTasks] = useState([]);
+  const tasksRef = useRef(tasks);
+  tasksRef.current = tasks;
   const [members, setMembers] = useState([]);
   const [loading, setLoading] = useState(true);
+  const [columnCursors, setColumnCursors] = useState({});
   const [dialogOpen, setDialogOpen] = useState(false);
   const [viewDialogOpen, setViewDialogOpen] = useState(false);
   const [viewingTask, setViewingTask] = useState(null);
   const [editingTask, setEditingTask] = useState(null);
-  const [aiLoading, setAiLoading] = useState(false);
   const [taskForm, setTaskForm] = useState({
     title: '',
     description: '',
@@ -157,10 +176,17 @@ const KanbanBoard = () => {
     setLoading(true);
     try {
       const response = await axios.get(
-        `${API_URL}/api/tasks/${workspaceId}?project_id=${projectId}`,
-        { headers: { Authorization: `Bearer ${token}` } }
+        `${API_URL}/api/board/${workspaceId}`,
+        {
+          params: { project_id: projectId, limit: BOARD_PAGE_SIZE },
+          headers: { Authorization: `Bearer ${token}` }
+        }
       );
-      setTasks(response.data.tasks || []);
+      const columns = response.data.columns || {};
+      setTasks(Object.values(columns).flatMap(column => column.tasks));
+      setColumnCursors(Object.fromEntries(
+        Object.entries(columns).map(([status, column]) => [status, column.next_cursor])
+      ));
     } catch (error) {
       toast.error('Failed to load tasks');
     } finally {
@@ -168,6 +194,29 @@ const KanbanBoard = () => {
     }
   };
 
+  const loadMoreTasks = async (status) => {
+    const cursor = columnCursors[status];
+    if (!cursor) return;
+
+    try {
+      const response = await axios.get(
+        `${API_URL}/api/board/${workspaceId}`,
+        {
+          params: { project_id: projectId, limit: BOARD_PAGE_SIZE, status, cursor },
+          headers: { Authorization: `Bearer ${token}` }
+        }
+      );
+      const column = response.data.columns[status];
+      setTasks(current => [
+        ...current,
+        ...column.tasks.filter(task => !current.some(t => t.id === task.id))
+      ]);
+      setColumnCursors(current => ({ ...current, [status]: column.next_cursor }));
+    } catch (error) {
+      toast.error('Failed to load more tasks');
+    }
+  };
+
   const fetchMembers = async () => {
     if (!workspaceId) return;
     
@@ -198,29 +247,6 @@ const KanbanBoard = () => {
       due_date: taskForm.due_date ? new Date(taskForm.due_date).toISOString() : null,
     };
 
-    if (taskForm.generate_ai && taskForm.title) {
-      setAiLoading(true);
-      try {
-        const prompt = `Break down this task into 3-5 actionable subtasks:\n\nTask: ${taskForm.title}${taskForm.description ? `\nDescription: ${taskForm.description}` : ''}\n\nReturn only a JSON array of subtasks in this format: [{"title": "subtask 1", "completed": false}]`;
-        
-        const response = await axios.post(
-          `${API_URL}/api/ai/generate-subtasks`,
-          { prompt },
-          { headers: { Authorization: `Bearer ${token}` } }
-        );
-        
-        if (response.data.subtasks) {
-          taskData.subtasks = response.data.subtasks;
-          toast.success('AI subtasks generated!');
-        }
-      } catch (error) {
-        console.error('AI generation failed:', error);
-        toast.error('AI generation failed, creating task without subtasks');
-      } finally {
-        setAiLoading(false);
-      }
-    }
-
     try {
       const response = await axios.post(
         `${API_URL}/api/tasks`,
@@ -229,7 +255,9 @@ const KanbanBoard = () => {
       );
       
       setTasks([...tasks, response.data.task]);
-      toast.success('Task created successfully!');
+      toast.success('Task created successfully!', taskData.generate_ai ? {
+        description: 'AI subtasks are being generated in the background'
+      } : undefined);
       setDialogOpen(false);
       resetForm();
     } catch (error) {
@@ -247,7 +275,7 @@ const KanbanBoard = () => {
         { headers: { Authorization: `Bearer ${token}` } }
       );
       
-      setTasks(tasks.map(t => t.id === editingTask.id ? response.data.task : t));
+      setTasks(tasks.map(t => t.id === editingTask.id ? applyTaskPatch(t, response.data) : t));
       toast.success('Task updated!');
       setEditingTask(null);
       setDialogOpen(false);
@@ -272,25 +300,88 @@ const KanbanBoard = () => {
   };
 
   const handleStatusChange = async (taskId, newStatus) => {
+    const task = tasks.find(t => t.id === taskId);
+    const headers = { Authorization: `Bearer ${token}` };
+    // Reject the move instead of overwriting a concurrent change
+    if (task?.version !== undefined) {
+      headers['If-Match'] = `"${task.version}"`;
+    }
+
     try {
       const response = await axios.patch(
         `${API_URL}/api/tasks/${taskId}`,
         { status: newStatus },
-        { headers: { Authorization: `Bearer ${token}` } }
+        { headers }
       );
       
-      setTasks(tasks.map(t => t.id === taskId ? response.data.task : t));
+      setTasks(tasks.map(t => t.id === taskId ? applyTaskPatch(t, response.data) : t));
     } catch (error) {
-      toast.error('Failed to update task status');
+      if (error.response?.status === 409) {
+        toast.error('This task was changed by someone else. Refreshing...');
+        fetchTasks();
+      } else {
+        toast.error('Failed to update task status');
+      }
     }
   };
 
-  const openViewDialog = (task) => {
-    setViewingTask(task);
+  // Board cards are slim; load the full task before showing details
+  const fetchTaskDetails = async (task) => {
+    if (task.subtasks !== undefined && task.description !== undefined) return task;
+
+    try {
+      const response = await axios.get(
+        `${API_URL}/api/task/${task.id}`,
+        { headers: { Authorization: `Bearer ${token}` } }
+      );
+      const fullTask = response.data.task;
+      setTasks(current => current.map(t => t.id === task.id ? fullTask : t));
+      return fullTask;
+    } catch (error) {
+      toast.error('Failed to load task details');
+      return task;
+    }
+  };
+
+  // AI subtasks are generated in the background; reload the cards on this board once their job finishes
+  const refreshTasks = async (taskIds) => {
+    const onBoard = taskIds.filter(id => tasksRef.current.some(t => t.id === id));
+    const responses = await Promise.allSettled(onBoard.map(id => axios.get(
+      `${API_URL}/api/task/${id}`,
+      { headers: { Authorization: `Bearer ${token}` } }
+    )));
+    const refreshed = Object.fromEntries(responses
+      .filter(result => result.status === 'fulfilled')
+      .map(result => [result.value.data.task.id, result.value.data.task]));
+    setTasks(current => current.map(t => refreshed[t.id] || t));
+  };
+
+  useEffect(() => {
+    if (!socket) return;
+
+    const handleMessage = (event) => {
+      try {
+        const data = JSON.parse(event.data);
+        if (data.type === 'task_ai_complete' || data.type === 'task_ai_failed') {
+          refreshTasks(data.task_ids || []);
+        }
+      } catch (err) {
+        console.error('Failed to parse WebSocket message:', err);
+      }
+    };
+
+    socket.addEventListener('message', handleMessage);
+    return () => socket.removeEventListener('message', handleMessage);
+    // eslint-disable-next-line react-hooks/exhaustive-deps
+  }, [socket, token, API_URL]);
+
+  const openViewDialog = async (task) => {
+    setViewingTask(await fetchTaskDetails(task));
     setViewDialogOpen(true);
   };
 
-  const openEditDialog = (task) => {
+  const openEditDialog = async (listedTask) => {
+    const task = await fetchTaskDetails(listedTask);
     setEditingTask(task);
     setTaskForm({
       title: task.title,
@@ -352,7 +443,7 @@ const KanbanBoard = () => {
                 <h3 className="font-semibold text-slate-900 dark:text-slate-100 flex items-center justify-between">
                   {column.label}
                   <span className="text-xs bg-white/60 px-2 py-1 rounded-full">
-                    {columnTasks.length}
+                    {columnTasks.length}{columnCursors[column.id] ? '+' : ''}
                   </span>
                 </h3>
               </div>
@@ -368,6 +459,16 @@ const KanbanBoard = () => {
                     isAdmin={isAdmin}
                   />
                 ))}
+                {columnCursors[column.id] && (
+                  <Button
+                    variant="ghost"
+                    className="w-full text-xs"
+                    onClick={() => loadMoreTasks(column.id)}
+                    data-testid={`load-more-${column.id}`}
+                  >
+                    Load more
+                  </Button>
+                )}
               </div>
             </div>
           );
@@ -583,11 +684,10 @@ const KanbanBoard = () => {
 
             <Button
               type="submit"
-              disabled={aiLoading}
               className="w-full bg-gradient-to-r from-[hsl(0,86%,66%)] to-[hsl(177,100%,55%)] text-white"
               data-testid="task-submit-btn"
             >
-              {aiLoading ? 'Generating with AI...' : editingTask ? 'Update Task' : 'Create Task'}
+              {editingTask ? 'Update Task' : 'Create Task'}
             </Button>
           </form>
         </DialogContent>
@@ -3,6 +3,7 @@ import { motion } from 'framer-motion';
 import { CheckCircle2, Circle, Clock, Flag, Eye, ArrowRight } from 'lucide-react';
 import axios from 'axios';
 import { useAuth } from '../contexts/AuthContext';
+import { applyTaskPatch } from '../lib/utils';
 import { useNavigate } from 'react-router-dom';
 import { Card } from '../components/ui/card';
 import { Badge } from '../components/ui/badge';
@@ -35,15 +36,15 @@ const MyTasks = () => {
     setLoading(true);
     try {
       const [tasksRes, membersRes] = await Promise.all([
-        axios.get(`${API_URL}/api/tasks/${workspaceId}`, {
+        axios.get(`${API_URL}/api/me/tasks`, {
+          params: { workspace_id: workspaceId },
           headers: { Authorization: `Bearer ${token}` }
         }),
         axios.get(`${API_URL}/api/workspaces/${workspaceId}/members`, {
           headers: { Authorization: `Bearer ${token}` }
         })
       ]);
-      const myTasks = tasksRes.data.tasks.filter(t => t.assignee_id === user?.id);
-      setTasks(myTasks);
+      setTasks(tasksRes.data.tasks);
       setMembers(membersRes.data.members || []);
     } catch (error) {
       toast.error('Failed to load tasks');
@@ -75,9 +76,9 @@ const MyTasks = () => {
         { headers: { Authorization: `Bearer ${token}` } }
       );
 
-      setTasks(tasks.map(t => t.id === taskId ? response.data.task : t));
+      setTasks(tasks.map(t => t.id === taskId ? applyTaskPatch(t, response.data) : t));
       if (viewingTask?.id === taskId) {
-        setViewingTask(response.data.task);
+        setViewingTask(applyTaskPatch(viewingTask, response.data));
       }
       toast.success(`Status changed to ${statusColumns.find(s => s.id === newStatus)?.label}`);
     } catch (error) {
@@ -112,9 +113,9 @@ const MyTasks = () => {
         { headers: { Authorization: `Bearer ${token}` } }
       );
 
-      setTasks(tasks.map(t => t.id === taskId ? response.data.task : t));
+      setTasks(tasks.map(t => t.id === taskId ? applyTaskPatch(t, response.data) : t));
       if (viewingTask?.id === taskId) {
-        setViewingTask(response.data.task);
+        setViewingTask(applyTaskPatch(viewingTask, response.data));
       }
       toast.success('Subtask updated!');
     } catch (error) {
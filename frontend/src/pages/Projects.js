@@ -4,6 +4,7 @@ import { useNavigate } from 'react-router-dom';
 import { Plus, FolderKanban, Users, Calendar, ArrowRight, ListTodo, ChevronDown, ChevronUp, CheckCircle2 } from 'lucide-react';
 import axios from 'axios';
 import { useAuth } from '../contexts/AuthContext';
+import { applyTaskPatch } from '../lib/utils';
 import { Button } from '../components/ui/button';
 import { Card } from '../components/ui/card';
 import {
@@ -144,7 +145,7 @@ const Projects = () => {
       );
       console.log('Subtask update response:', response.data);
       setProjectTasks(projectTasks.map(t =>
-        t.id === taskId ? response.data.task : t
+        t.id === taskId ? applyTaskPatch(t, response.data) : t
       ));
       toast.success('Subtask updated!');
     } catch (error) {
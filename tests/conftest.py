@@ -0,0 +1,97 @@
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+# Archival is exercised directly; keep the background archiver out of the way
+os.environ.setdefault("ARCHIVE_AFTER_DAYS", "0")
+
+from fastapi.testclient import TestClient
+from mongomock_motor import AsyncMongoMockClient
+
+import server
+
+
+async def _skip_ping():
+    pass
+
+
+def fresh_database():
+    mock = AsyncMongoMockClient()
+    server.client = mock
+    server.db = mock["devpulse"]
+
+
+fresh_database()
+server.verify_conn = _skip_ping
+
+
+@pytest.fixture(scope="session")
+def app_client():
+    with TestClient(server.app) as client:
+        yield client
+
+
+@pytest.fixture
+def client(app_client):
+    """The app on an empty database with cold caches"""
+    fresh_database()
+    for cache in (server.token_cache, server.principal_cache, server.membership_cache):
+        cache.clear()
+    app_client.portal.call(server.ensure_indexes)
+    return app_client
+
+
+@pytest.fixture
+def call(client):
+    """Run a coroutine function on the app's event loop"""
+    return client.portal.call
+
+
+def register(client, name: str) -> dict:
+    r = client.post("/api/auth/register", json={"name": name, "email": f"{name.lower()}@example.com", "password": "pw"})
+    r.raise_for_status()
+    body = r.json()
+    return {
+        "id": body["user"]["id"],
+        "workspace_id": body["workspace_id"],
+        "headers": {"Authorization": f"Bearer {body['access_token']}"}
+    }
+
+
+@pytest.fixture
+def owner(client) -> dict:
+    """A registered user with their own workspace and one project in it"""
+    user = register(client, "Ann")
+    r = client.post("/api/projects", json={"name": "P", "workspace_id": user["workspace_id"]}, headers=user["headers"])
+    r.raise_for_status()
+    user["project_id"] = r.json()["id"]
+    return user
+
+
+@pytest.fixture
+def member(client, owner) -> dict:
+    """A second member of the owner's workspace"""
+    r = client.post(
+        f"/api/workspaces/{owner['workspace_id']}/members",
+        json={"name": "Bob", "email": "bob@example.com", "password": "pw", "workspace_id": owner["workspace_id"]},
+        headers=owner["headers"]
+    )
+    r.raise_for_status()
+    r = client.post("/api/auth/login", json={"email": "bob@example.com", "password": "pw"})
+    r.raise_for_status()
+    return {
+        "id": r.json()["user"]["id"],
+        "workspace_id": owner["workspace_id"],
+        "headers": {"Authorization": f"Bearer {r.json()['access_token']}"}
+    }
+
+
+def create_task(client, owner: dict, **fields) -> dict:
+    payload = {"title": "Task", "project_id": owner["project_id"], "workspace_id": owner["workspace_id"], **fields}
+    r = client.post("/api/tasks", json=payload, headers=owner["headers"])
+    r.raise_for_status()
+    return r.json()["task"]
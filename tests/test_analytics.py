@@ -0,0 +1,48 @@
+import server
+from conftest import create_task
+
+
+def test_task_rejects_assignee_outside_workspace(client, owner):
+    r = client.post("/api/tasks", json={
+        "title": "T", "project_id": owner["project_id"], "workspace_id": owner["workspace_id"], "assignee_id": "evil.x"
+    }, headers=owner["headers"])
+    assert r.status_code == 400
+
+    task = create_task(client, owner)
+    r = client.patch(f"/api/tasks/{task['id']}", json={"assignee_id": "$evil"}, headers=owner["headers"])
+    assert r.status_code == 400
+    r = client.patch(f"/api/tasks/{task['id']}", json={"assignee_id": owner["id"]}, headers=owner["headers"])
+    assert r.status_code == 200
+
+
+def test_bulk_rejects_assignee_outside_workspace(client, owner, member):
+    r = client.post("/api/tasks/bulk", json={"operations": [
+        {"op": "create", "create": {"title": "a", "project_id": owner["project_id"], "workspace_id": owner["workspace_id"], "assignee_id": "evil.x"}},
+        {"op": "create", "create": {"title": "b", "project_id": owner["project_id"], "workspace_id": owner["workspace_id"], "assignee_id": member["id"]}}
+    ]}, headers=owner["headers"])
+    results = r.json()["results"]
+    assert [x["ok"] for x in results] == [False, True]
+    assert results[0]["error"] == server.ASSIGNEE_NOT_MEMBER
+
+
+def test_rollup_keys_cannot_nest_or_start_with_dollar():
+    task = {"status": "todo", "priority": "high", "assignee_id": "$a.b"}
+    keys = server.task_contribution(task)
+    assert "open_by_assignee.%24a%2Eb" in keys
+    assert server.open_assignees({"open_by_assignee": {"%24a%2Eb": 1}}) == ["$a.b"]
+
+
+def test_analytics_skips_malformed_counters(client, call, owner, member):
+    call(server.db.workspace_stats.insert_one, {"workspace_id": owner["workspace_id"]})
+    create_task(client, owner, assignee_id=member["id"])
+    call(server.db.workspace_stats.update_one, {"workspace_id": owner["workspace_id"]}, {"$set": {
+        "open_by_assignee.evil": {"x": 1},
+        "priority.low": "many"
+    }})
+
+    r = client.get(f"/api/analytics/{owner['workspace_id']}", headers=owner["headers"])
+    assert r.status_code == 200
+    body = r.json()
+    assert body["total_tasks"] == 1
+    assert body["tasks_by_priority"] == {"medium": 1}
+    assert [w["name"] for w in body["workload"]] == ["Bob"]
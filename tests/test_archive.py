@@ -0,0 +1,63 @@
+from datetime import datetime, timedelta, timezone
+from functools import partial
+
+import server
+from conftest import create_task
+
+LONG_AGO = "2020-01-01T00:00:00+00:00"
+
+
+def finished_task(client, call, owner) -> dict:
+    task = create_task(client, owner, status="done")
+    call(server.db.tasks.update_one, {"id": task["id"]}, {"$set": {"updated_at": LONG_AGO}})
+    return task
+
+
+def hold_lease(call, owner_name: str, seconds: int):
+    call(partial(server.db.archive_runs.update_one, {"_id": "tasks"}, {"$set": {
+        "owner": owner_name, "lease_until": datetime.now(timezone.utc) + timedelta(seconds=seconds)
+    }}, upsert=True))
+
+
+def test_archives_old_done_tasks(client, call, owner):
+    done = finished_task(client, call, owner)
+    open_task = create_task(client, owner)
+
+    assert call(server.archive_done_tasks) == 1
+    assert call(server.db.tasks.distinct, "id") == [open_task["id"]]
+    assert call(server.db.tasks_archive.distinct, "id") == [done["id"]]
+    r = client.get(f"/api/tasks/{owner['workspace_id']}/changes?since=2", headers=owner["headers"])
+    assert [(c["op"], c["task_id"]) for c in r.json()["changes"]] == [("archived", done["id"])]
+    # The lease is released when the run finishes
+    assert call(server.db.archive_runs.find_one, {"_id": "tasks"})["lease_until"] is None
+
+
+def test_only_one_worker_holds_the_lease(client, call, owner):
+    finished_task(client, call, owner)
+    hold_lease(call, "other-worker", 60)
+    assert call(server.archive_done_tasks) is None
+    assert call(server.db.tasks_archive.count_documents, {}) == 0
+
+    # A holder that stopped renewing is presumed dead and its run is taken over
+    hold_lease(call, "other-worker", -1)
+    assert call(server.archive_done_tasks) == 1
+
+
+def test_task_changed_mid_batch_stays_hot(client, call, owner, monkeypatch):
+    raced = finished_task(client, call, owner)
+    other = finished_task(client, call, owner)
+
+    # Reopened after the batch copied it to the archive, before the delete
+    collection = type(server.db.tasks)
+    bulk_write = collection.bulk_write
+    async def reopen_then_bulk_write(self, requests, **kwargs):
+        result = await bulk_write(self, requests, **kwargs)
+        if self.name == "tasks_archive":
+            monkeypatch.setattr(collection, "bulk_write", bulk_write)
+            await server.db.tasks.update_one({"id": raced["id"]}, {"$set": {"status": "todo"}, "$inc": {"version": 1}})
+        return result
+    monkeypatch.setattr(collection, "bulk_write", reopen_then_bulk_write)
+
+    assert call(server.archive_done_tasks) == 1
+    assert call(server.db.tasks.distinct, "id") == [raced["id"]]
+    assert call(server.db.tasks_archive.distinct, "id") == [other["id"]]
@@ -0,0 +1,52 @@
+import server
+
+
+def test_principal_is_served_from_cache(client, owner):
+    hits = server.principal_cache.hits
+    client.get("/api/workspaces", headers=owner["headers"]).raise_for_status()
+    client.get("/api/workspaces", headers=owner["headers"]).raise_for_status()
+    assert server.principal_cache.hits >= hits + 2
+
+
+def test_new_member_is_visible_at_once_on_this_worker(client, owner, member):
+    # create_member invalidated the warm membership entry, so Bob is let in straight away
+    r = client.get(f"/api/tasks/{owner['workspace_id']}", headers=member["headers"])
+    assert r.status_code == 200
+
+
+def test_removal_on_another_worker_applies_within_the_ttl(client, call, owner, member, monkeypatch):
+    url = f"/api/tasks/{owner['workspace_id']}"
+    assert client.get(url, headers=member["headers"]).status_code == 200
+    call(server.db.workspaces.update_one, {"id": owner["workspace_id"]}, {"$pull": {"members": {"user_id": member["id"]}}})
+
+    # Within the TTL the warm entry still admits Bob; once it lapses he is refused
+    assert client.get(url, headers=member["headers"]).status_code == 200
+    monkeypatch.setattr(server.membership_cache, "ttl", 0)
+    server.membership_cache.invalidate(owner["workspace_id"])
+    assert client.get(url, headers=member["headers"]).status_code == 403
+
+
+def test_admin_actions_bypass_the_membership_cache(client, call, owner, member):
+    workspace_id = owner["workspace_id"]
+    call(server.db.workspaces.update_one, {"id": workspace_id, "members.user_id": member["id"]}, {"$set": {"members.$.role": "admin"}})
+    server.membership_cache.invalidate(workspace_id)
+    assert client.get(f"/api/tasks/{workspace_id}", headers=member["headers"]).status_code == 200
+
+    # Demoted on another worker while this worker's membership entry still says admin
+    call(server.db.workspaces.update_one, {"id": workspace_id, "members.user_id": member["id"]}, {"$set": {"members.$.role": "member"}})
+    r = client.post(f"/api/workspaces/{workspace_id}/invites", json={"workspace_id": workspace_id}, headers=member["headers"])
+    assert r.status_code == 403
+
+
+def test_change_password_checks_the_stored_hash(client, call, owner):
+    client.get("/api/workspaces", headers=owner["headers"]).raise_for_status()
+    # Changed on another worker; this worker's cached principal still holds the old hash
+    new_hash = call(server.get_password_hash, "elsewhere")
+    call(server.db.users.update_one, {"id": owner["id"]}, {"$set": {"password": new_hash}})
+
+    r = client.post("/api/auth/change-password", json={"old_password": "pw", "new_password": "x"}, headers=owner["headers"])
+    assert r.status_code == 400
+    r = client.post("/api/auth/change-password", json={"old_password": "elsewhere", "new_password": "x"}, headers=owner["headers"])
+    assert r.status_code == 200
+    r = client.post("/api/auth/login", json={"email": "ann@example.com", "password": "x"})
+    assert r.status_code == 200
@@ -0,0 +1,140 @@
+import asyncio
+import json
+
+import server
+
+
+class ChangeStreamCollection:
+    """Stands in for a replica set collection: inserts reach every open watch() in order"""
+    def __init__(self):
+        self.streams = []
+        self.inserted = []
+        self.writable = asyncio.Event()
+        self.writable.set()
+
+    async def insert_many(self, docs, ordered=True):
+        await self.writable.wait()
+        for doc in docs:
+            self.inserted.append(doc)
+            for stream in self.streams:
+                stream.push(doc)
+
+    def watch(self, pipeline, resume_after=None):
+        stream = ChangeStream(pipeline[0]["$match"]["fullDocument.origin"]["$ne"])
+        self.streams.append(stream)
+        return stream
+
+
+class ChangeStream:
+    def __init__(self, skip_origin):
+        self.skip_origin = skip_origin
+        self.changes = asyncio.Queue()
+        self.resume_token = None
+
+    def push(self, doc):
+        if doc["origin"] != self.skip_origin:
+            self.changes.put_nowait({"operationType": "insert", "fullDocument": doc})
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        return await self.changes.get()
+
+
+class RecordingSocket:
+    def __init__(self):
+        self.received = asyncio.Queue()
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, text):
+        self.received.put_nowait(text)
+
+
+async def settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+def test_publish_reaches_sockets_on_another_worker():
+    async def scenario():
+        collection = ChangeStreamCollection()
+        workers = [server.ConnectionManager(), server.ConnectionManager()]
+        for worker in workers:
+            await worker.use_backend(server.MongoChangeStreamBroadcast(collection))
+        await settle()
+        local, remote = RecordingSocket(), [RecordingSocket(), RecordingSocket()]
+        await workers[0].connect(local, "w1")
+        for socket in remote:
+            await workers[1].connect(socket, "w1")
+
+        # The request path returns while the insert for other workers is still blocked
+        collection.writable.clear()
+        message = {"type": "task_created", "seq": 1}
+        await asyncio.wait_for(workers[0].broadcast_to_workspace("w1", message), 0.1)
+        assert json.loads(await asyncio.wait_for(local.received.get(), 1)) == message
+        assert collection.inserted == []
+
+        collection.writable.set()
+        for socket in remote:
+            assert json.loads(await asyncio.wait_for(socket.received.get(), 1)) == message
+        # The publishing worker doesn't hear its own message back
+        await settle()
+        assert local.received.empty()
+
+        for worker in workers:
+            await worker.backend.stop()
+
+    asyncio.run(scenario())
+
+
+def test_failed_publish_is_counted():
+    async def scenario():
+        class Unwritable(ChangeStreamCollection):
+            async def insert_many(self, docs, ordered=True):
+                raise RuntimeError("not primary")
+
+        backend = server.MongoChangeStreamBroadcast(Unwritable())
+        backend.bind(lambda workspace_id, text: None)
+        await backend.start()
+        await backend.publish("w1", "{}")
+        await backend.publish("w1", "{}")
+        await asyncio.wait_for(backend.outbox.join(), 1)
+        assert backend.failures == 2
+        await backend.stop()
+
+    asyncio.run(scenario())
+
+
+def test_slow_consumer_is_dropped_and_closed(monkeypatch):
+    monkeypatch.setattr(server, "WS_SEND_QUEUE_SIZE", 1)
+
+    async def scenario():
+        class StuckSocket(RecordingSocket):
+            closed = None
+
+            async def send_text(self, text):
+                await asyncio.Event().wait()
+
+            async def close(self, code):
+                self.closed = code
+
+        manager, socket = server.ConnectionManager(), StuckSocket()
+        await manager.connect(socket, "w1")
+        for seq in range(3):
+            manager.deliver_local("w1", str(seq))
+        assert manager.dropped == 1 and "w1" not in manager.active_connections
+        # The close is tracked until it finishes
+        assert len(manager.closing) == 1
+        await settle()
+        assert socket.closed == 1013 and not manager.closing
+
+    asyncio.run(scenario())
@@ -0,0 +1,65 @@
+from fastapi import Response
+
+import server
+from conftest import create_task
+
+
+def bulk(client, owner, *operations):
+    r = client.post("/api/tasks/bulk", json={"operations": list(operations)}, headers=owner["headers"])
+    r.raise_for_status()
+    return r.json()["results"]
+
+
+def test_bulk_applies_each_op_and_reports_per_item(client, call, owner):
+    call(server.db.workspace_stats.insert_one, {"workspace_id": owner["workspace_id"]})
+    keep, gone = create_task(client, owner), create_task(client, owner)
+    results = bulk(client, owner,
+        {"op": "create", "create": {"title": "new", "project_id": owner["project_id"], "workspace_id": owner["workspace_id"]}},
+        {"op": "update", "task_id": keep["id"], "update": {"status": "done"}},
+        {"op": "delete", "task_id": gone["id"]},
+        {"op": "delete", "task_id": "missing"}
+    )
+    assert [(x["ok"], x.get("error")) for x in results] == [(True, None), (True, None), (True, None), (False, "Task not found")]
+
+    stats = call(server.db.workspace_stats.find_one, {"workspace_id": owner["workspace_id"]})
+    assert server.counter_values(stats["status"]) == {"todo": 1, "done": 1}
+    r = client.get(f"/api/tasks/{owner['workspace_id']}/changes?since=2", headers=owner["headers"])
+    assert [c["op"] for c in r.json()["changes"]] == ["created", "updated", "deleted"]
+
+
+def test_bulk_rejects_repeated_task_ids_and_stale_versions(client, owner):
+    task = create_task(client, owner)
+    results = bulk(client, owner,
+        {"op": "update", "task_id": task["id"], "update": {"status": "done"}},
+        {"op": "delete", "task_id": task["id"]}
+    )
+    assert [x["ok"] for x in results] == [False, False]
+
+    results = bulk(client, owner, {"op": "update", "task_id": task["id"], "version": 7, "update": {"status": "done"}})
+    assert results[0]["error"] == server.BULK_CONFLICT
+
+
+def test_bulk_reports_a_write_that_lost_a_race(client, call, owner, monkeypatch):
+    call(server.db.workspace_stats.insert_one, {"workspace_id": owner["workspace_id"]})
+    raced, other = create_task(client, owner), create_task(client, owner)
+    user = call(server.db.users.find_one, {"id": owner["id"]}, {"_id": 0})
+
+    # A PATCH lands between the bulk request's read and its bulk_write
+    collection = type(server.db.tasks)
+    bulk_write = collection.bulk_write
+    async def patch_then_bulk_write(self, requests, **kwargs):
+        monkeypatch.setattr(collection, "bulk_write", bulk_write)
+        await server.update_task(raced["id"], server.TaskUpdate(status="review"), Response(), if_match=None, user=user)
+        return await bulk_write(self, requests, **kwargs)
+    monkeypatch.setattr(collection, "bulk_write", patch_then_bulk_write)
+
+    results = bulk(client, owner,
+        {"op": "update", "task_id": raced["id"], "update": {"status": "done"}},
+        {"op": "update", "task_id": other["id"], "update": {"status": "done"}}
+    )
+    assert [(x["ok"], x.get("error")) for x in results] == [(False, server.BULK_CONFLICT), (True, None)]
+
+    stored = call(server.db.tasks.find_one, {"id": raced["id"]})
+    assert stored["status"] == "review"
+    stats = call(server.db.workspace_stats.find_one, {"workspace_id": owner["workspace_id"]})
+    assert server.counter_values(stats["status"]) == {"review": 1, "done": 1}
@@ -0,0 +1,68 @@
+import pytest
+from starlette.websockets import WebSocketDisconnect
+
+import server
+from conftest import create_task, register
+
+
+def changes(client, owner, since):
+    r = client.get(f"/api/tasks/{owner['workspace_id']}/changes?since={since}", headers=owner["headers"])
+    r.raise_for_status()
+    return r.json()
+
+
+def test_resume_returns_changes_after_since_in_order(client, owner):
+    first = create_task(client, owner)
+    client.patch(f"/api/tasks/{first['id']}", json={"status": "done"}, headers=owner["headers"]).raise_for_status()
+    client.delete(f"/api/tasks/{first['id']}", headers=owner["headers"]).raise_for_status()
+
+    body = changes(client, owner, 1)
+    assert [(c["seq"], c["op"]) for c in body["changes"]] == [(2, "updated"), (3, "deleted")]
+    assert body["changes"][0]["task"]["status"] == "done"
+    assert (body["last_seq"], body["has_more"], body["reset"]) == (3, False, False)
+    assert changes(client, owner, 3)["changes"] == []
+
+
+def test_resume_waits_at_a_fresh_gap_then_moves_past_it(client, call, owner, monkeypatch):
+    create_task(client, owner)
+    # A concurrent writer has reserved seq 2 but not yet written its entry
+    call(server.db.workspace_revisions.update_one, {"workspace_id": owner["workspace_id"]}, {"$inc": {"change_seq": 1}})
+    create_task(client, owner)
+
+    body = changes(client, owner, 1)
+    assert (body["changes"], body["last_seq"], body["has_more"]) == ([], 1, True)
+
+    monkeypatch.setattr(server, "CHANGE_GAP_GRACE_SECONDS", 0)
+    body = changes(client, owner, 1)
+    assert [c["seq"] for c in body["changes"]] == [3]
+
+
+def test_resume_past_compaction_asks_for_a_reset(client, call, owner):
+    for _ in range(3):
+        create_task(client, owner)
+    call(server.db.task_changes.delete_many, {"seq": {"$lte": 2}})
+    assert changes(client, owner, 0)["reset"] is True
+    assert [c["seq"] for c in changes(client, owner, 2)["changes"]] == [3]
+    # A client ahead of the server (say, after a restore) must refetch too
+    assert changes(client, owner, 9)["reset"] is True
+
+
+def test_websocket_replays_then_streams_live_changes(client, owner):
+    task = create_task(client, owner)
+    token = owner["headers"]["Authorization"].split()[1]
+    with client.websocket_connect(f"/ws/{owner['workspace_id']}?since=0&token={token}") as ws:
+        replay = ws.receive_json()
+        assert replay["type"] == "changes" and [c["seq"] for c in replay["changes"]] == [1]
+        client.patch(f"/api/tasks/{task['id']}", json={"title": "renamed"}, headers=owner["headers"]).raise_for_status()
+        live = ws.receive_json()
+        assert (live["type"], live["seq"], live["changes"]["title"]) == ("task_updated", 2, "renamed")
+
+
+@pytest.mark.parametrize("query", ["since=0", "since=0&token=garbage", "since=0&token={outsider}"])
+def test_websocket_refuses_unauthenticated_or_outside_callers(client, owner, query):
+    create_task(client, owner)
+    outsider = register(client, "Eve")["headers"]["Authorization"].split()[1]
+    with pytest.raises(WebSocketDisconnect) as refused:
+        with client.websocket_connect(f"/ws/{owner['workspace_id']}?{query.format(outsider=outsider)}") as ws:
+            ws.receive_json()
+    assert refused.value.code == 1008
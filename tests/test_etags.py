@@ -0,0 +1,33 @@
+import server
+from conftest import create_task
+
+
+def test_unchanged_resources_answer_304(client, owner):
+    create_task(client, owner)
+    url = f"/api/tasks/{owner['workspace_id']}"
+    r = client.get(url, headers=owner["headers"])
+    etag = r.headers["etag"]
+    assert client.get(url, headers={**owner["headers"], "If-None-Match": etag}).status_code == 304
+
+    create_task(client, owner, title="Another")
+    r = client.get(url, headers={**owner["headers"], "If-None-Match": etag})
+    assert r.status_code == 200 and r.headers["etag"] != etag
+
+
+def test_members_are_not_served_from_a_stale_cache(client, call, owner, member):
+    url = f"/api/workspaces/{owner['workspace_id']}/members"
+    r = client.get(url, headers=owner["headers"])
+    assert len(r.json()["members"]) == 2
+    etag = r.headers["etag"]
+
+    # Another worker removes Bob: Mongo and the revision move, this process's membership cache doesn't
+    call(server.db.workspaces.update_one, {"id": owner["workspace_id"]}, {"$pull": {"members": {"user_id": member["id"]}}})
+    call(server.bump_revision, owner["workspace_id"], "members")
+
+    r = client.get(url, headers={**owner["headers"], "If-None-Match": etag})
+    assert r.status_code == 200 and r.headers["etag"] != etag
+    assert [m["user_id"] for m in r.json()["members"]] == [owner["id"]]
+
+    call(server.db.workspace_stats.insert_one, {"workspace_id": owner["workspace_id"]})
+    r = client.get(f"/api/dashboard/{owner['workspace_id']}", headers=owner["headers"])
+    assert [m["user_id"] for m in r.json()["members"]] == [owner["id"]]
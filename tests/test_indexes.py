@@ -0,0 +1,18 @@
+import logging
+
+import server
+
+
+def test_blocked_unique_index_does_not_drop_the_others(client, call, caplog):
+    call(server.db.users.drop_indexes)
+    call(server.db.users.insert_many, [
+        {"id": "u1", "email": "dup@example.com"},
+        {"id": "u2", "email": "dup@example.com"}
+    ])
+
+    with caplog.at_level(logging.ERROR):
+        failed = call(server.ensure_indexes)
+
+    assert failed == ["users.email_1"]
+    assert "id_1" in call(server.db.users.index_information)
+    assert "dup@example.com" in caplog.text
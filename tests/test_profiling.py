@@ -0,0 +1,30 @@
+import asyncio
+
+import server
+
+
+def run_middleware(headers=()):
+    calls = []
+
+    async def inner(scope, receive, send):
+        calls.append(scope["path"])
+
+    scope = {"type": "http", "method": "GET", "path": "/api/tasks/w1", "headers": list(headers), "query_string": b""}
+    asyncio.run(server.ProfilingMiddleware(inner)(scope, None, None))
+    return calls
+
+
+def test_unprofiled_requests_skip_route_matching(monkeypatch):
+    matched = []
+    monkeypatch.setattr(server, "match_route", lambda scope: matched.append(scope["path"]) or "/api/tasks/{workspace_id}")
+    monkeypatch.setattr(server, "PROFILE_TOKEN", "secret")
+    monkeypatch.setattr(server, "PROFILE_SAMPLE_EVERY", 0)
+
+    assert run_middleware() == ["/api/tasks/w1"]
+    assert run_middleware([(b"x-profile-token", b"wrong")]) == ["/api/tasks/w1"]
+    assert matched == []
+
+    # Sampling needs the route for its per-route counter
+    monkeypatch.setattr(server, "PROFILE_SAMPLE_EVERY", 1000)
+    run_middleware()
+    assert matched == ["/api/tasks/w1"]
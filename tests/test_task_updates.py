@@ -0,0 +1,40 @@
+import server
+from conftest import create_task, register
+
+
+def test_if_match_guards_concurrent_updates(client, owner):
+    task = create_task(client, owner)
+    url = f"/api/tasks/{task['id']}"
+    r = client.patch(url, json={"status": "in_progress"}, headers={**owner["headers"], "If-Match": '"1"'})
+    assert r.status_code == 200 and r.headers["etag"] == '"2"'
+    assert r.json()["version"] == 2 and set(r.json()["changes"]) == {"status", "updated_at"}
+
+    r = client.patch(url, json={"status": "review"}, headers={**owner["headers"], "If-Match": '"1"'})
+    assert r.status_code == 409 and r.json()["detail"]["version"] == 2
+    # Without If-Match the last writer wins
+    assert client.patch(url, json={"status": "review"}, headers=owner["headers"]).status_code == 200
+    assert client.patch("/api/tasks/missing", json={"status": "done"}, headers=owner["headers"]).status_code == 404
+
+
+def test_outsiders_cannot_update(client, owner):
+    task = create_task(client, owner)
+    outsider = register(client, "Eve")
+    r = client.patch(f"/api/tasks/{task['id']}", json={"status": "done"}, headers=outsider["headers"])
+    assert r.status_code == 403
+
+
+def test_update_succeeds_with_a_stale_cached_principal(client, call, owner):
+    task = create_task(client, owner)
+    eve = register(client, "Eve")
+    client.get("/api/workspaces", headers=eve["headers"]).raise_for_status()
+
+    # Eve joins on another worker; this worker's principal still lists only her own workspace
+    workspace_id = owner["workspace_id"]
+    call(server.db.workspaces.update_one, {"id": workspace_id}, {"$push": {"members": {"user_id": eve["id"], "role": "member"}}})
+    call(server.db.users.update_one, {"id": eve["id"]}, {"$push": {"workspaces": workspace_id}})
+    server.membership_cache.invalidate(workspace_id)
+
+    r = client.patch(f"/api/tasks/{task['id']}", json={"status": "done"}, headers={**eve["headers"], "If-Match": '"1"'})
+    assert r.status_code == 200 and r.headers["etag"] == '"2"'
+    r = client.patch(f"/api/tasks/{task['id']}", json={"status": "todo"}, headers={**eve["headers"], "If-Match": '"1"'})
+    assert r.status_code == 409
@@ -0,0 +1,46 @@
+from fastapi import Response
+
+import server
+from conftest import create_task
+
+SUBTASKS = [{"title": "Write it", "completed": False}]
+
+
+def test_webhook_is_queued_once_and_applied(client, call, owner):
+    task = create_task(client, owner)
+    body = {"event": "ai.task_complete", "data": {"task_id": task["id"], "subtasks": SUBTASKS}}
+    r = client.post("/api/webhooks", json=body, headers={"Idempotency-Key": "k1"})
+    assert r.status_code == 202 and "duplicate" not in r.json()
+    r = client.post("/api/webhooks", json=body, headers={"Idempotency-Key": "k1"})
+    assert r.json()["duplicate"] is True
+
+    call(server.webhook_applier.drain)
+    r = client.get(f"/api/task/{task['id']}", headers=owner["headers"])
+    assert r.json()["task"]["subtasks"] == SUBTASKS
+    assert r.json()["task"]["version"] == 2
+
+
+def test_batch_apply_logs_the_version_it_wrote(client, call, owner, monkeypatch):
+    call(server.db.workspace_stats.insert_one, {"workspace_id": owner["workspace_id"]})
+    task = create_task(client, owner)
+    user = call(server.db.users.find_one, {"id": owner["id"]}, {"_id": 0})
+
+    # A status PATCH lands after the batch has read the task and before its bulk_write
+    collection = type(server.db.tasks)
+    bulk_write = collection.bulk_write
+    async def patch_then_bulk_write(self, requests, **kwargs):
+        monkeypatch.setattr(collection, "bulk_write", bulk_write)
+        await server.update_task(task["id"], server.TaskUpdate(status="done"), Response(), if_match=None, user=user)
+        return await bulk_write(self, requests, **kwargs)
+    monkeypatch.setattr(collection, "bulk_write", patch_then_bulk_write)
+
+    assert call(server.apply_ai_subtasks_batch, {task["id"]: SUBTASKS}) == 1
+
+    stored = call(server.db.tasks.find_one, {"id": task["id"]}, {"_id": 0})
+    assert stored["status"] == "done" and stored["subtasks"] == SUBTASKS and stored["version"] == 3
+    # The log's last entry is the state a client replaying it must end up with
+    r = client.get(f"/api/tasks/{owner['workspace_id']}/changes?since=0", headers=owner["headers"])
+    last = r.json()["changes"][-1]["task"]
+    assert (last["status"], last["version"], last["subtasks"]) == ("done", 3, SUBTASKS)
+    stats = call(server.db.workspace_stats.find_one, {"workspace_id": owner["workspace_id"]})
+    assert server.counter_values(stats["status"]) == {"done": 1}